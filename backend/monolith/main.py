@@ -0,0 +1,84 @@
+import httpx
+from fastapi import FastAPI
+from fastapi.middleware.cors import CORSMiddleware
+from contextlib import asynccontextmanager
+from backend.shared.database import engine
+from backend.shared.migrations import ensure_schema
+from backend.services.order_service import routes as order_routes
+from backend.services.returns_service import routes as returns_routes
+from backend.services.inventory_service import routes as inventory_routes
+from backend.services.customer_service import routes as customer_routes
+from backend.services.chatbot_service import routes as chatbot_routes, chat_manager
+from backend.services.salesforce_service import routes as salesforce_routes
+from backend.services.notification_service import routes as notification_routes
+from backend.services.analytics_service import routes as analytics_routes
+from backend.services.gateway_service.compression import CompressionMiddleware
+from backend.services.gateway_service.connection_pool import GATEWAY_DEADLINE, DEADLINE_BUDGETS, EVENT_STREAM_PATHS
+from backend.shared.metrics import instrument_app
+from backend.shared.deadline import DeadlineMiddleware
+from backend.shared.query_stats import QueryStatsMiddleware
+
+# Single-process run mode: every service router in one app, one DB engine, no loopback HTTP hops.
+# Serves the same /api/{service}/... paths as the gateway, so the frontend works unchanged.
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Every service shares one database, so one schema check covers them all
+    await ensure_schema(engine)
+    # The chatbot's calls back into the API are dispatched in-process instead of over the network
+    chat_manager.internal_transport = httpx.ASGITransport(app=app)
+    await order_routes.manager.start()
+    # Poll the change log while anyone follows an SSE feed
+    feeds = [order_routes.feed, returns_routes.feed, inventory_routes.feed]
+    for feed in feeds:
+        await feed.start()
+    yield
+    for feed in feeds:
+        await feed.stop()
+    await order_routes.manager.stop()
+    chat_manager.internal_transport = None
+    await engine.dispose()
+
+app = FastAPI(title="Customer Order Portal (Monolith)", lifespan=lifespan)
+
+# Same end-to-end budgets as the gateway, which the monolith stands in for
+app.add_middleware(
+    DeadlineMiddleware,
+    default_budget=GATEWAY_DEADLINE,
+    budgets={f"/api/{service}/": seconds for service, seconds in DEADLINE_BUDGETS.items()},
+    exempt=EVENT_STREAM_PATHS,
+)
+
+# Per-statement latency, slow-query log and N+1 detection
+app.add_middleware(QueryStatsMiddleware, service="monolith")
+
+instrument_app(app, "monolith", engine)
+
+app.add_middleware(
+    CORSMiddleware,
+    allow_origins=["*"],
+    allow_credentials=True,
+    allow_methods=["*"],
+    allow_headers=["*"],
+    # Order listing pagination headers, readable by the frontend
+    expose_headers=["X-Next-Cursor", "X-Total-Count"],
+)
+
+app.add_middleware(CompressionMiddleware)
+
+app.include_router(order_routes.router, prefix="/api/orders", tags=["orders"])
+app.include_router(returns_routes.router, prefix="/api/returns", tags=["returns"])
+app.include_router(inventory_routes.router, prefix="/api/inventory", tags=["inventory"])
+app.include_router(customer_routes.router, prefix="/api/tickets", tags=["tickets"])
+app.include_router(chatbot_routes.router, prefix="/api/chatbot", tags=["chatbot"])
+app.include_router(salesforce_routes.router, prefix="/api/salesforce", tags=["salesforce"])
+app.include_router(notification_routes.router, prefix="/api/notifications", tags=["notifications"])
+app.include_router(analytics_routes.router, prefix="/api/analytics", tags=["analytics"])
+
+@app.get("/health")
+async def health_check():
+    return {"status": "healthy"}
+
+if __name__ == "__main__":
+    import uvicorn
+    uvicorn.run(app, host="0.0.0.0", port=8000)
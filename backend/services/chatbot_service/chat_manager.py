@@ -4,6 +4,8 @@ import logging
 import re
 import httpx
 from datetime import datetime
+from backend.shared.metrics import httpx_event_hooks
+from backend.shared.deadline import propagate_deadline
 
 logger = logging.getLogger(__name__)
 
@@ -16,6 +18,9 @@ pending_orders = {}
 # Backend service URLs
 GATEWAY_URL = "http://localhost:8000/api"
 
+# Set by monolith mode to route GATEWAY_URL calls in-process rather than over loopback HTTP
+internal_transport = None
+
 async def process_message(message: str, user_email: str) -> str:
     """Process chat message through the orchestrator and specialist agents"""
     try:
@@ -77,7 +82,15 @@ async def process_with_real_services(specialist: str, message: str, history: str
     order_match = re.search(r'(?:order\s*#?\s*|#)(\d{3,5})', message, re.IGNORECASE)
     order_id = order_match.group(1) if order_match else None
     
-    async with httpx.AsyncClient(timeout=30.0) as client:
+    # Calls back through the gateway carry what is left of this chat request's deadline
+    event_hooks = httpx_event_hooks("chatbot", "gateway")
+    event_hooks["request"].append(propagate_deadline)
+
+    async with httpx.AsyncClient(
+        timeout=30.0,
+        transport=internal_transport,
+        event_hooks=event_hooks,
+    ) as client:
         
         if specialist == "RETURNS":
             if order_id:
@@ -1,8 +1,15 @@
 from fastapi import FastAPI
 from backend.services.chatbot_service import routes
+from backend.shared.metrics import instrument_app
+from backend.shared.deadline import DeadlineMiddleware
 
 app = FastAPI(title="Chatbot Service")
 
+# Stop working on requests whose caller has already given up
+app.add_middleware(DeadlineMiddleware)
+
+instrument_app(app, "chatbot")
+
 app.include_router(routes.router, prefix="/api/chatbot", tags=["chatbot"])
 
 @app.get("/health")
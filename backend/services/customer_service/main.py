@@ -1,16 +1,29 @@
 from fastapi import FastAPI
-from backend.services.customer_service import routes, models
+from backend.services.customer_service import routes
 from backend.shared.database import engine
+from backend.shared.migrations import ensure_schema
 from contextlib import asynccontextmanager
+from backend.shared.metrics import instrument_app
+from backend.shared.deadline import DeadlineMiddleware
+from backend.shared.query_stats import QueryStatsMiddleware
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    async with engine.begin() as conn:
-        await conn.run_sync(models.Base.metadata.create_all)
+    # One version query when the schema is current; pending migrations are applied under a lock
+    await ensure_schema(engine)
     yield
+    await engine.dispose()
 
 app = FastAPI(title="Customer Service", lifespan=lifespan)
 
+# Stop working on requests whose caller has already given up
+app.add_middleware(DeadlineMiddleware)
+
+# Per-statement latency, slow-query log and N+1 detection
+app.add_middleware(QueryStatsMiddleware, service="tickets")
+
+instrument_app(app, "tickets", engine)
+
 app.include_router(routes.router, prefix="/api/tickets", tags=["tickets"])
 
 @app.get("/health")
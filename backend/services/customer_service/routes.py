@@ -1,7 +1,7 @@
 from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List
-from backend.shared.database import get_db
+from backend.shared.database import get_db, get_read_db
 from backend.shared import auth
 from . import crud, schemas, models
 
@@ -19,7 +19,7 @@ async def create_ticket(
 async def read_tickets(
     skip: int = 0, 
     limit: int = 100, 
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
     current_user: dict = Depends(auth.get_current_user)
 ):
     return await crud.get_tickets(db, skip=skip, limit=limit)
@@ -27,7 +27,7 @@ async def read_tickets(
 @router.get("/{ticket_id}", response_model=schemas.Ticket)
 async def read_ticket(
     ticket_id: int, 
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
     current_user: dict = Depends(auth.get_current_user)
 ):
     db_ticket = await crud.get_ticket(db, ticket_id=ticket_id)
@@ -0,0 +1,70 @@
+import os
+import time
+import asyncio
+from dataclasses import dataclass, field
+from typing import Awaitable, Callable, Dict, List
+import httpx
+from dotenv import load_dotenv
+from backend.shared.logger import get_logger
+
+load_dotenv()
+logger = get_logger(__name__)
+
+GATEWAY_BFF_CALL_TIMEOUT = float(os.getenv("GATEWAY_BFF_CALL_TIMEOUT", 2.0))
+
+# Request headers passed on to every fanned-out call; the upstreams authorise each one themselves
+FORWARDED_HEADERS = ("authorization", "accept-language", "x-request-id")
+
+@dataclass
+class UpstreamCall:
+    name: str  # key in the composite response
+    service: str
+    path: str
+    params: Dict[str, str] = field(default_factory=dict)
+
+# Everything the dashboard page needs, fetched in one round trip from the browser
+DASHBOARD_CALLS = [
+    UpstreamCall("metrics", "analytics", "/api/analytics/dashboard"),
+    UpstreamCall("sales", "analytics", "/api/analytics/sales", {"days": "7"}),
+    UpstreamCall("recent_orders", "orders", "/api/orders/", {"limit": "10"}),
+    UpstreamCall("inventory", "inventory", "/api/inventory/"),
+    UpstreamCall("returns", "returns", "/api/returns/"),
+]
+
+async def aggregate(
+    calls: List[UpstreamCall],
+    fetch: Callable[[UpstreamCall], Awaitable[httpx.Response]],
+    timeout: float = GATEWAY_BFF_CALL_TIMEOUT,
+) -> dict:
+    """Run every call concurrently, each under its own deadline, and keep whatever came back in time"""
+
+    async def run(call: UpstreamCall):
+        start = time.perf_counter()
+        try:
+            response = await asyncio.wait_for(fetch(call), timeout=timeout)
+        except asyncio.TimeoutError:
+            return call, None, {"error": "timeout", "timeout": timeout}
+        except Exception as e:
+            logger.warning(f"BFF call {call.name} to {call.service} failed: {str(e)}")
+            return call, None, {"error": "unavailable", "detail": str(e)}
+        elapsed_ms = round((time.perf_counter() - start) * 1000, 1)
+        if response.status_code >= 400:
+            return call, None, {"error": "upstream_error", "status": response.status_code, "elapsed_ms": elapsed_ms}
+        try:
+            body = response.json()
+        except ValueError as e:
+            # e.g. an HTML error page from a proxy with a 200: one bad section, not a failed dashboard
+            logger.warning(f"BFF call {call.name} to {call.service} returned a non-JSON body: {str(e)}")
+            return call, None, {"error": "invalid_response", "status": response.status_code, "detail": str(e), "elapsed_ms": elapsed_ms}
+        return call, body, {"status": response.status_code, "elapsed_ms": elapsed_ms}
+
+    results = await asyncio.gather(*[run(call) for call in calls])
+
+    data, errors, timings = {}, {}, {}
+    for call, body, meta in results:
+        if body is None:
+            errors[call.name] = meta
+        else:
+            data[call.name] = body
+            timings[call.name] = meta["elapsed_ms"]
+    return {"data": data, "errors": errors, "partial": bool(errors), "timings_ms": timings}
@@ -0,0 +1,143 @@
+import os
+import time
+import asyncio
+import enum
+import httpx
+from typing import Awaitable, Callable, Dict, Iterable
+from dotenv import load_dotenv
+from backend.shared.logger import get_logger
+
+load_dotenv()
+logger = get_logger(__name__)
+
+GATEWAY_BREAKER_FAILURE_THRESHOLD = int(os.getenv("GATEWAY_BREAKER_FAILURE_THRESHOLD", 5))
+GATEWAY_BREAKER_RESET_TIMEOUT = float(os.getenv("GATEWAY_BREAKER_RESET_TIMEOUT", 30.0))
+GATEWAY_BREAKER_HALF_OPEN_PROBES = int(os.getenv("GATEWAY_BREAKER_HALF_OPEN_PROBES", 1))
+GATEWAY_BULKHEAD_LIMIT = int(os.getenv("GATEWAY_BULKHEAD_LIMIT", 50))
+GATEWAY_BULKHEAD_WAIT = float(os.getenv("GATEWAY_BULKHEAD_WAIT", 1.0))
+
+# Tighter concurrency for services that sit behind slow LLM calls
+BULKHEAD_LIMITS = {
+    "chatbot": int(os.getenv("GATEWAY_BULKHEAD_LIMIT_CHATBOT", 10)),
+    "salesforce": int(os.getenv("GATEWAY_BULKHEAD_LIMIT_SALESFORCE", 10)),
+}
+
+class BreakerState(str, enum.Enum):
+    CLOSED = "CLOSED"
+    OPEN = "OPEN"
+    HALF_OPEN = "HALF_OPEN"
+
+class UpstreamUnavailableError(Exception):
+    def __init__(self, message: str, retry_after: float = 1.0):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+class CircuitBreaker:
+    def __init__(self, service: str):
+        self.service = service
+        self.state = BreakerState.CLOSED
+        self.consecutive_failures = 0
+        self.opened_at = 0.0
+        self.probes_in_flight = 0
+        self.rejected = 0
+
+    def retry_after(self) -> float:
+        return max(0.0, self.opened_at + GATEWAY_BREAKER_RESET_TIMEOUT - time.monotonic())
+
+    def allow_request(self) -> bool:
+        if self.state == BreakerState.OPEN:
+            if self.retry_after() > 0:
+                return False
+            self.state = BreakerState.HALF_OPEN
+            logger.info(f"Circuit for {self.service} is half-open, probing")
+        if self.state == BreakerState.HALF_OPEN:
+            if self.probes_in_flight >= GATEWAY_BREAKER_HALF_OPEN_PROBES:
+                return False
+            self.probes_in_flight += 1
+        return True
+
+    def record_success(self):
+        self.consecutive_failures = 0
+        if self.state == BreakerState.OPEN:
+            # A straggler that started before the circuit opened is not a probe
+            return
+        if self.state == BreakerState.HALF_OPEN:
+            logger.info(f"Circuit for {self.service} closed")
+        self.state = BreakerState.CLOSED
+
+    def record_failure(self):
+        self.consecutive_failures += 1
+        if self.state == BreakerState.HALF_OPEN or self.consecutive_failures >= GATEWAY_BREAKER_FAILURE_THRESHOLD:
+            if self.state != BreakerState.OPEN:
+                logger.warning(f"Circuit for {self.service} opened after {self.consecutive_failures} failures")
+            self.state = BreakerState.OPEN
+            self.opened_at = time.monotonic()
+
+    def release_probe(self):
+        if self.probes_in_flight > 0:
+            self.probes_in_flight -= 1
+
+class UpstreamGuards:
+    """A circuit breaker plus a bulkhead semaphore per upstream, so one slow service can't starve the rest"""
+
+    def __init__(self, services: Iterable[str]):
+        self.breakers: Dict[str, CircuitBreaker] = {}
+        self.bulkheads: Dict[str, asyncio.Semaphore] = {}
+        self.limits: Dict[str, int] = {}
+        self.in_flight: Dict[str, int] = {}
+        for service in services:
+            self.in_flight[service] = 0
+            self.breakers[service] = CircuitBreaker(service)
+            self.limits[service] = BULKHEAD_LIMITS.get(service, GATEWAY_BULKHEAD_LIMIT)
+            self.bulkheads[service] = asyncio.Semaphore(self.limits[service])
+
+    async def call(self, service: str, send: Callable[[], Awaitable]):
+        breaker = self.breakers[service]
+        if not breaker.allow_request():
+            breaker.rejected += 1
+            raise UpstreamUnavailableError(f"Circuit open for {service}", retry_after=breaker.retry_after())
+
+        probing = breaker.state == BreakerState.HALF_OPEN
+        bulkhead = self.bulkheads[service]
+        try:
+            try:
+                await asyncio.wait_for(bulkhead.acquire(), timeout=GATEWAY_BULKHEAD_WAIT)
+            except asyncio.TimeoutError:
+                breaker.rejected += 1
+                raise UpstreamUnavailableError(f"Too many concurrent requests to {service}")
+
+            self.in_flight[service] += 1
+            try:
+                response = await send()
+            except (httpx.TransportError, httpx.TimeoutException):
+                # Only the upstream failing counts; errors of the request itself, such as an oversized body, pass through
+                breaker.record_failure()
+                raise
+            finally:
+                self.in_flight[service] -= 1
+                bulkhead.release()
+        finally:
+            if probing:
+                breaker.release_probe()
+
+        if response.status_code >= 500:
+            breaker.record_failure()
+        else:
+            breaker.record_success()
+        return response
+
+    def reset(self, service: str):
+        self.breakers[service] = CircuitBreaker(service)
+
+    def stats(self) -> dict:
+        return {
+            service: {
+                "state": breaker.state.value,
+                "consecutive_failures": breaker.consecutive_failures,
+                "retry_after": round(breaker.retry_after(), 1) if breaker.state == BreakerState.OPEN else 0,
+                "rejected": breaker.rejected,
+                "in_flight": self.in_flight[service],
+                "concurrency_limit": self.limits[service],
+            }
+            for service, breaker in self.breakers.items()
+        }
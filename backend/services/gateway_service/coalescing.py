@@ -0,0 +1,87 @@
+import os
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, Tuple
+import httpx
+from fastapi import Request
+from dotenv import load_dotenv
+from backend.services.gateway_service.proxy import auth_scope
+
+load_dotenv()
+
+GATEWAY_COALESCING_ENABLED = os.getenv("GATEWAY_COALESCING_ENABLED", "true").lower() == "true"
+# Opt-in per service: a coalesced response is buffered in full so it can be shared, which gives up
+# streaming. Worth it for small, expensive responses such as the analytics aggregates; not for the
+# large order and inventory listings, which stream through. Cacheable reads are coalesced by the
+# response cache whatever this says, and only while they are small enough to cache.
+COALESCED_SERVICES = {
+    service.strip() for service in os.getenv("GATEWAY_COALESCING_SERVICES", "analytics").split(",") if service.strip()
+}
+
+def coalescing_key(service: str, request: Request) -> str:
+    query = "&".join(sorted(f"{k}={v}" for k, v in request.query_params.multi_items()))
+    return f"{request.method}:{service}:{request.url.path}?{query}:{auth_scope(request)}"
+
+class SingleFlight:
+    """Collapses identical concurrent upstream calls into one and fans the result out to every waiter"""
+
+    def __init__(self):
+        self.in_flight: Dict[str, asyncio.Task] = {}
+        self.leaders = 0
+        self.followers = 0
+
+    def should_coalesce(self, service: str, request: Request) -> bool:
+        if not GATEWAY_COALESCING_ENABLED or request.method != "GET" or service not in COALESCED_SERVICES:
+            return False
+        return "no-cache" not in request.headers.get("cache-control", "")
+
+    async def do(self, key: str, fetch: Callable[[], Awaitable[httpx.Response]]) -> httpx.Response:
+        result, _ = await self.join(key, fetch)
+        return result
+
+    async def join(self, key: str, fetch: Callable[[], Awaitable[Any]]) -> Tuple[Any, bool]:
+        """Like do(), but also says whether this caller started the call, and so may use a result that
+        can't be shared, such as an unread stream"""
+        task = self.in_flight.get(key)
+        leader = task is None
+        if leader:
+            self.leaders += 1
+            # Run the call as its own task so a disconnecting leader doesn't cancel it for the followers
+            task = asyncio.ensure_future(fetch())
+            self.in_flight[key] = task
+            task.add_done_callback(lambda done: self._finish(key, done))
+        else:
+            self.followers += 1
+        try:
+            return await asyncio.shield(task), leader
+        except asyncio.CancelledError:
+            if leader:
+                task.add_done_callback(_close_unclaimed)
+            raise
+
+    def _finish(self, key: str, task: asyncio.Task):
+        if self.in_flight.get(key) is task:
+            del self.in_flight[key]
+        # Mark the exception as retrieved even if every waiter has gone away
+        if not task.cancelled():
+            task.exception()
+
+    def stats(self) -> dict:
+        calls = self.leaders + self.followers
+        return {
+            "enabled": GATEWAY_COALESCING_ENABLED,
+            "services": sorted(COALESCED_SERVICES),
+            "in_flight": len(self.in_flight),
+            "upstream_calls": self.leaders,
+            "coalesced": self.followers,
+            "coalesced_ratio": round(self.followers / calls, 3) if calls else 0.0,
+        }
+
+def _close_unclaimed(task: asyncio.Task):
+    # The leader went away, and only it could have read an unread stream: give the connection back
+    if task.cancelled() or task.exception() is not None:
+        return
+    result = task.result()
+    if isinstance(result, httpx.Response) and not result.is_stream_consumed:
+        asyncio.ensure_future(result.aclose())
+
+single_flight = SingleFlight()
@@ -0,0 +1,170 @@
+import os
+import zlib
+from typing import Dict, Optional
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from dotenv import load_dotenv
+
+load_dotenv()
+
+GATEWAY_COMPRESSION_ENABLED = os.getenv("GATEWAY_COMPRESSION_ENABLED", "true").lower() == "true"
+GATEWAY_COMPRESSION_MIN_SIZE = int(os.getenv("GATEWAY_COMPRESSION_MIN_SIZE", 1024))
+GATEWAY_COMPRESSION_LEVEL = int(os.getenv("GATEWAY_COMPRESSION_LEVEL", 6))
+# Server preference when the client accepts several encodings equally
+GATEWAY_COMPRESSION_ENCODINGS = os.getenv("GATEWAY_COMPRESSION_ENCODINGS", "br,zstd,gzip")
+
+COMPRESSIBLE_TYPES = (
+    "application/json",
+    "application/javascript",
+    "application/xml",
+    "image/svg+xml",
+    "text/",
+)
+
+# brotli and zstandard are optional; gzip is always available
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+class GzipCompressor:
+    def __init__(self, level: int):
+        self.compressor = zlib.compressobj(level, zlib.DEFLATED, 31)  # wbits=31 writes a gzip container
+
+    def compress(self, data: bytes) -> bytes:
+        # Sync flush so each streamed chunk reaches the client immediately
+        return self.compressor.compress(data) + self.compressor.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self) -> bytes:
+        return self.compressor.flush(zlib.Z_FINISH)
+
+class BrotliCompressor:
+    def __init__(self, level: int):
+        # Brotli quality runs 0-11; the gzip-style 1-9 level maps onto the lower, faster range
+        self.compressor = brotli.Compressor(quality=min(level, 11))
+
+    def compress(self, data: bytes) -> bytes:
+        return self.compressor.process(data) + self.compressor.flush()
+
+    def finish(self) -> bytes:
+        return self.compressor.finish()
+
+class ZstdCompressor:
+    def __init__(self, level: int):
+        self.compressor = zstandard.ZstdCompressor(level=level).compressobj()
+
+    def compress(self, data: bytes) -> bytes:
+        return self.compressor.compress(data) + self.compressor.flush(zstandard.COMPRESSOBJ_FLUSH_BLOCK)
+
+    def finish(self) -> bytes:
+        return self.compressor.flush(zstandard.COMPRESSOBJ_FLUSH_FINISH)
+
+def available_encodings() -> Dict[str, type]:
+    compressors = {"gzip": GzipCompressor}
+    if brotli is not None:
+        compressors["br"] = BrotliCompressor
+    if zstandard is not None:
+        compressors["zstd"] = ZstdCompressor
+    return compressors
+
+def negotiate_encoding(accept_encoding: str, supported) -> Optional[str]:
+    """Pick the best supported coding from an Accept-Encoding header, honouring q-values"""
+    weights = {}
+    for part in accept_encoding.split(","):
+        coding, _, params = part.strip().partition(";")
+        if not coding:
+            continue
+        q = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        weights[coding.strip().lower()] = q
+
+    preference = [coding.strip() for coding in GATEWAY_COMPRESSION_ENCODINGS.split(",")]
+    candidates = [
+        coding for coding in preference
+        if coding in supported and weights.get(coding, weights.get("*", 0.0)) > 0
+    ]
+    if not candidates:
+        return None
+    # Highest q wins; ties go to the server preference order
+    return max(candidates, key=lambda coding: (weights.get(coding, weights.get("*", 0.0)), -preference.index(coding)))
+
+class CompressionMiddleware:
+    """Compresses responses per Accept-Encoding, including streamed ones, chunk by chunk"""
+
+    def __init__(self, app: ASGIApp, minimum_size: int = GATEWAY_COMPRESSION_MIN_SIZE, level: int = GATEWAY_COMPRESSION_LEVEL):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.level = level
+        self.compressors = available_encodings()
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http" or not GATEWAY_COMPRESSION_ENABLED:
+            await self.app(scope, receive, send)
+            return
+
+        encoding = negotiate_encoding(Headers(scope=scope).get("accept-encoding", ""), self.compressors)
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        responder = _CompressingResponder(send, encoding, self.compressors[encoding](self.level), self.minimum_size)
+        await self.app(scope, receive, responder.send)
+
+class _CompressingResponder:
+    def __init__(self, send: Send, encoding: str, compressor, minimum_size: int):
+        self.downstream = send
+        self.encoding = encoding
+        self.compressor = compressor
+        self.minimum_size = minimum_size
+        self.compressing = False
+
+    async def send(self, message: Message):
+        if message["type"] == "http.response.start":
+            # Decide from the headers alone so streamed bodies are never held back waiting for bytes
+            if self._compressible(Headers(raw=message["headers"]), message["status"]):
+                self._start_compressing(message)
+            await self.downstream(message)
+            return
+        if message["type"] != "http.response.body" or not self.compressing:
+            await self.downstream(message)
+            return
+
+        body = message.get("body", b"")
+        more_body = message.get("more_body", False)
+        data = self.compressor.compress(body) if body else b""
+        if not more_body:
+            data += self.compressor.finish()
+        await self.downstream({"type": "http.response.body", "body": data, "more_body": more_body})
+
+    def _compressible(self, headers: Headers, status: int) -> bool:
+        if status in (204, 206, 304) or "content-encoding" in headers:
+            return False
+        if "no-transform" in headers.get("cache-control", ""):
+            return False
+        if not headers.get("content-type", "").startswith(COMPRESSIBLE_TYPES):
+            return False
+        # The size threshold only applies when the length is known up front; bodies of unknown length are streams
+        content_length = headers.get("content-length")
+        return content_length is None or int(content_length) >= self.minimum_size
+
+    def _start_compressing(self, start_message: Message):
+        self.compressing = True
+        headers = MutableHeaders(raw=start_message["headers"])
+        headers["Content-Encoding"] = self.encoding
+        headers.add_vary_header("Accept-Encoding")
+        if "content-length" in headers:
+            del headers["content-length"]
+        # The compressed bytes differ from the identity representation, so a strong ETag becomes weak
+        etag = headers.get("etag")
+        if etag and not etag.startswith("W/"):
+            headers["ETag"] = f"W/{etag}"
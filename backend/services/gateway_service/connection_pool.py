@@ -0,0 +1,110 @@
+import os
+import httpx
+from typing import Dict, List
+from dotenv import load_dotenv
+from backend.shared.logger import get_logger
+from backend.shared.deadline import propagate_deadline
+
+load_dotenv()
+logger = get_logger(__name__)
+
+GATEWAY_MAX_CONNECTIONS = int(os.getenv("GATEWAY_MAX_CONNECTIONS", 100))
+GATEWAY_MAX_KEEPALIVE_CONNECTIONS = int(os.getenv("GATEWAY_MAX_KEEPALIVE_CONNECTIONS", 20))
+GATEWAY_KEEPALIVE_EXPIRY = float(os.getenv("GATEWAY_KEEPALIVE_EXPIRY", 30.0))
+GATEWAY_CONNECT_TIMEOUT = float(os.getenv("GATEWAY_CONNECT_TIMEOUT", 5.0))
+GATEWAY_UPSTREAM_TIMEOUT = float(os.getenv("GATEWAY_UPSTREAM_TIMEOUT", 60.0))  # Ceiling per read; the deadline is usually tighter
+# Server-Sent Events streams each hold an upstream connection for as long as the client listens,
+# so they get a pool of their own instead of starving regular requests
+GATEWAY_MAX_EVENT_STREAMS = int(os.getenv("GATEWAY_MAX_EVENT_STREAMS", 1000))
+GATEWAY_HTTP2 = os.getenv("GATEWAY_HTTP2", "false").lower() == "true"
+
+# Total time a request may take end to end, passed downstream as a deadline header
+GATEWAY_DEADLINE = float(os.getenv("GATEWAY_DEADLINE", 10.0))
+# Longer budgets for services that sit behind slow LLM calls
+DEADLINE_BUDGETS = {
+    "chatbot": float(os.getenv("GATEWAY_DEADLINE_CHATBOT", 60.0)),
+    "salesforce": float(os.getenv("GATEWAY_DEADLINE_SALESFORCE", 30.0)),
+}
+# Change feeds: proxied through the stream pool and exempt from the deadline
+EVENT_STREAM_PATHS = {"/api/orders/changes", "/api/inventory/changes", "/api/returns/changes"}
+
+
+def _http2_available() -> bool:
+    try:
+        import h2  # noqa: F401
+        return True
+    except ImportError:
+        return False
+
+
+class UpstreamPool:
+    """Long-lived httpx clients, one per upstream service, owned by the gateway lifespan"""
+
+    def __init__(self, services: Dict[str, List[str]]):
+        self.services = services
+        self.clients: Dict[str, httpx.AsyncClient] = {}
+        self.stream_clients: Dict[str, httpx.AsyncClient] = {}
+        self.request_counts: Dict[str, int] = {}
+        self.http2 = GATEWAY_HTTP2 and _http2_available()
+        if GATEWAY_HTTP2 and not self.http2:
+            logger.warning("GATEWAY_HTTP2 is set but the 'h2' package is not installed, falling back to HTTP/1.1")
+
+    async def start(self):
+        limits = httpx.Limits(
+            max_connections=GATEWAY_MAX_CONNECTIONS,
+            max_keepalive_connections=GATEWAY_MAX_KEEPALIVE_CONNECTIONS,
+            keepalive_expiry=GATEWAY_KEEPALIVE_EXPIRY,
+        )
+        timeout = httpx.Timeout(GATEWAY_UPSTREAM_TIMEOUT, connect=GATEWAY_CONNECT_TIMEOUT)
+        for service in self.services:
+            self.request_counts[service] = 0
+            # No base_url: the load balancer picks a replica per request and the pool keeps one per host
+            self.clients[service] = httpx.AsyncClient(
+                limits=limits,
+                timeout=timeout,
+                http2=self.http2,
+                event_hooks={"request": [self._make_counter(service), propagate_deadline]},
+            )
+            # The read timeout applies per chunk, and the upstream's heartbeats arrive well within it
+            self.stream_clients[service] = httpx.AsyncClient(
+                limits=httpx.Limits(max_connections=GATEWAY_MAX_EVENT_STREAMS, max_keepalive_connections=0),
+                timeout=timeout,
+                event_hooks={"request": [self._make_counter(service)]},
+            )
+        logger.info(f"Upstream pools ready for {len(self.clients)} services (http2={self.http2})")
+
+    async def close(self):
+        for client in [*self.clients.values(), *self.stream_clients.values()]:
+            await client.aclose()
+        self.clients.clear()
+        self.stream_clients.clear()
+
+    def get_client(self, service: str) -> httpx.AsyncClient:
+        return self.clients[service]
+
+    def get_stream_client(self, service: str) -> httpx.AsyncClient:
+        return self.stream_clients[service]
+
+    def _make_counter(self, service: str):
+        async def count_request(request: httpx.Request):
+            self.request_counts[service] += 1
+        return count_request
+
+    def stats(self) -> dict:
+        """Pool utilisation per upstream, read from the underlying httpcore connection pool"""
+        result = {}
+        for service, client in self.clients.items():
+            # httpcore does not expose these publicly, so read them defensively
+            pool = getattr(client._transport, "_pool", None)
+            connections = list(getattr(pool, "connections", []))
+            idle = sum(1 for conn in connections if conn.is_idle())
+            result[service] = {
+                "backends": self.services[service],
+                "requests": self.request_counts.get(service, 0),
+                "connections": len(connections),
+                "active": len(connections) - idle,
+                "idle": idle,
+                "max_connections": GATEWAY_MAX_CONNECTIONS,
+                "utilisation": round((len(connections) - idle) / GATEWAY_MAX_CONNECTIONS, 3),
+            }
+        return result
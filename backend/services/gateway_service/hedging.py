@@ -0,0 +1,118 @@
+import os
+import time
+import asyncio
+from collections import deque
+from typing import Awaitable, Callable, Deque, Dict, Optional
+from fastapi import Request
+from dotenv import load_dotenv
+from backend.shared.deadline import remaining
+from backend.shared.logger import get_logger
+from backend.shared.metrics import HEDGED_REQUESTS
+
+load_dotenv()
+logger = get_logger(__name__)
+
+GATEWAY_HEDGING_ENABLED = os.getenv("GATEWAY_HEDGING_ENABLED", "false").lower() == "true"
+GATEWAY_HEDGE_PERCENTILE = float(os.getenv("GATEWAY_HEDGE_PERCENTILE", 95.0))
+GATEWAY_HEDGE_MIN_SAMPLES = int(os.getenv("GATEWAY_HEDGE_MIN_SAMPLES", 20))
+GATEWAY_HEDGE_WINDOW = int(os.getenv("GATEWAY_HEDGE_WINDOW", 200))  # recent latencies kept per service
+GATEWAY_HEDGE_BUDGET = float(os.getenv("GATEWAY_HEDGE_BUDGET", 0.1))  # max extra load, as a share of requests
+GATEWAY_HEDGE_MIN_DELAY = float(os.getenv("GATEWAY_HEDGE_MIN_DELAY", 0.005))
+
+# Only safe to send twice: the upstream may well run both copies
+HEDGE_METHODS = {"GET", "HEAD"}
+# A duplicate LLM call costs far more than the tail latency it saves
+NEVER_HEDGE = {"chatbot", "salesforce"}
+
+class Hedger:
+    """Sends a second copy of a slow idempotent request once it passes the service's recent p95,
+    and answers with whichever copy finishes first"""
+
+    def __init__(self):
+        self.latencies: Dict[str, Deque[float]] = {}
+        self.requests: Dict[str, int] = {}
+        self.hedged: Dict[str, int] = {}
+        self.hedge_wins: Dict[str, int] = {}
+
+    def should_hedge(self, service: str, request: Request) -> bool:
+        return GATEWAY_HEDGING_ENABLED and request.method in HEDGE_METHODS and service not in NEVER_HEDGE
+
+    def hedge_delay(self, service: str) -> Optional[float]:
+        samples = self.latencies.get(service)
+        if not samples or len(samples) < GATEWAY_HEDGE_MIN_SAMPLES:
+            return None  # Too little history to know what "slow" means yet
+        ordered = sorted(samples)
+        index = min(len(ordered) - 1, int(len(ordered) * GATEWAY_HEDGE_PERCENTILE / 100))
+        return max(GATEWAY_HEDGE_MIN_DELAY, ordered[index])
+
+    def _within_budget(self, service: str) -> bool:
+        return self.hedged.get(service, 0) < GATEWAY_HEDGE_BUDGET * self.requests.get(service, 0)
+
+    def _record(self, service: str, seconds: float):
+        if service not in self.latencies:
+            self.latencies[service] = deque(maxlen=GATEWAY_HEDGE_WINDOW)
+        self.latencies[service].append(seconds)
+
+    async def call(self, service: str, attempt: Callable[[], Awaitable]):
+        self.requests[service] = self.requests.get(service, 0) + 1
+
+        async def timed():
+            start = time.perf_counter()
+            response = await attempt()
+            self._record(service, time.perf_counter() - start)
+            return response
+
+        primary = asyncio.ensure_future(timed())
+        delay = self.hedge_delay(service)
+        budget = remaining()
+        if delay is None or (budget is not None and budget <= delay):
+            return await primary
+
+        try:
+            done, _ = await asyncio.wait({primary}, timeout=delay)
+        except asyncio.CancelledError:
+            primary.cancel()
+            raise
+        if done or not self._within_budget(service):
+            return await primary
+
+        # The load balancer counts the primary as outstanding, so the hedge lands on another replica
+        self.hedged[service] = self.hedged.get(service, 0) + 1
+        hedge = asyncio.ensure_future(timed())
+        pending = {primary, hedge}
+        error = None
+        try:
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        winner = "hedge" if task is hedge else "primary"
+                        if winner == "hedge":
+                            self.hedge_wins[service] = self.hedge_wins.get(service, 0) + 1
+                        HEDGED_REQUESTS.labels(service, winner).inc()
+                        return task.result()
+                    error = task.exception()
+            HEDGED_REQUESTS.labels(service, "failed").inc()
+            raise error
+        finally:
+            # The slower copy is no longer wanted
+            for task in pending:
+                task.cancel()
+
+    def stats(self) -> dict:
+        return {
+            "enabled": GATEWAY_HEDGING_ENABLED,
+            "percentile": GATEWAY_HEDGE_PERCENTILE,
+            "budget": GATEWAY_HEDGE_BUDGET,
+            "services": {
+                service: {
+                    "requests": self.requests[service],
+                    "hedge_delay": self.hedge_delay(service),
+                    "hedged": self.hedged.get(service, 0),
+                    "hedge_wins": self.hedge_wins.get(service, 0),
+                }
+                for service in self.requests
+            },
+        }
+
+hedger = Hedger()
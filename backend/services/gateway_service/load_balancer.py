@@ -0,0 +1,146 @@
+import os
+import random
+import asyncio
+from typing import Awaitable, Callable, Dict, List, Optional, Set
+import httpx
+from dotenv import load_dotenv
+from backend.shared.logger import get_logger
+
+load_dotenv()
+logger = get_logger(__name__)
+
+GATEWAY_LB_STRATEGY = os.getenv("GATEWAY_LB_STRATEGY", "least_outstanding")  # or "p2c"
+GATEWAY_HEALTH_INTERVAL = float(os.getenv("GATEWAY_HEALTH_INTERVAL", 5.0))
+GATEWAY_HEALTH_TIMEOUT = float(os.getenv("GATEWAY_HEALTH_TIMEOUT", 2.0))
+GATEWAY_UNHEALTHY_THRESHOLD = int(os.getenv("GATEWAY_UNHEALTHY_THRESHOLD", 2))
+GATEWAY_HEALTHY_THRESHOLD = int(os.getenv("GATEWAY_HEALTHY_THRESHOLD", 2))
+
+def load_service_backends(defaults: Dict[str, List[str]]) -> Dict[str, List[str]]:
+    """Replica lists can be overridden per service, e.g. GATEWAY_UPSTREAMS_ORDERS=http://a:8001,http://b:8001"""
+    services = {}
+    for service, urls in defaults.items():
+        override = os.getenv(f"GATEWAY_UPSTREAMS_{service.upper()}")
+        if override:
+            urls = [url.strip().rstrip("/") for url in override.split(",") if url.strip()]
+        services[service] = urls
+    return services
+
+class Backend:
+    def __init__(self, url: str):
+        self.url = url
+        self.healthy = True
+        self.outstanding = 0
+        self.requests = 0
+        self.consecutive_failures = 0
+        self.consecutive_successes = 0
+
+    def record_probe(self, ok: bool):
+        if ok:
+            self.consecutive_failures = 0
+            self.consecutive_successes += 1
+            if not self.healthy and self.consecutive_successes >= GATEWAY_HEALTHY_THRESHOLD:
+                self.healthy = True
+                logger.info(f"Backend {self.url} is healthy again")
+        else:
+            self.consecutive_successes = 0
+            self.consecutive_failures += 1
+            if self.healthy and self.consecutive_failures >= GATEWAY_UNHEALTHY_THRESHOLD:
+                self.healthy = False
+                logger.warning(f"Backend {self.url} failed {self.consecutive_failures} health checks, draining")
+
+class LoadBalancer:
+    """Spreads each service's traffic over its replicas and drains the ones failing /health"""
+
+    def __init__(self, services: Dict[str, List[str]]):
+        self.backends: Dict[str, List[Backend]] = {
+            service: [Backend(url) for url in urls] for service, urls in services.items()
+        }
+        self.pool = None
+        self.health_task: Optional[asyncio.Task] = None
+
+    def choose(self, service: str, exclude: Set[str] = frozenset()) -> Backend:
+        backends = [backend for backend in self.backends[service] if backend.url not in exclude]
+        # Fail open: if every replica looks unhealthy, still try rather than reject outright
+        candidates = [backend for backend in backends if backend.healthy] or backends
+        if len(candidates) == 1:
+            return candidates[0]
+        if GATEWAY_LB_STRATEGY == "p2c":
+            first, second = random.sample(candidates, 2)
+            return first if first.outstanding <= second.outstanding else second
+        fewest = min(backend.outstanding for backend in candidates)
+        return random.choice([backend for backend in candidates if backend.outstanding == fewest])
+
+    def hold(self, service: str, url: str) -> Callable[[], None]:
+        """Count a long-lived stream as outstanding on the replica at url until the returned release is
+        called; calling it more than once is harmless"""
+        backend = next(backend for backend in self.backends[service] if backend.url == url)
+        backend.outstanding += 1
+        held = True
+
+        def release():
+            nonlocal held
+            if held:
+                held = False
+                backend.outstanding -= 1
+        return release
+
+    async def call(self, service: str, send: Callable[[str], Awaitable]):
+        tried = set()
+        while True:
+            backend = self.choose(service, exclude=tried)
+            backend.outstanding += 1
+            backend.requests += 1
+            try:
+                return await send(backend.url)
+            except httpx.ConnectError:
+                # Passive check: a replica refusing connections counts like a failed probe. The request
+                # never reached it, so it is safe to try the next replica whatever the method.
+                backend.record_probe(False)
+                tried.add(backend.url)
+                if len(tried) >= len(self.backends[service]):
+                    raise
+            finally:
+                backend.outstanding -= 1
+
+    async def start(self, pool):
+        self.pool = pool
+        self.health_task = asyncio.create_task(self._health_loop())
+
+    async def close(self):
+        if self.health_task:
+            self.health_task.cancel()
+            try:
+                await self.health_task
+            except asyncio.CancelledError:
+                pass
+            self.health_task = None
+
+    async def _health_loop(self):
+        while True:
+            await asyncio.sleep(GATEWAY_HEALTH_INTERVAL)
+            await asyncio.gather(*[
+                self._probe(service, backend)
+                for service, backends in self.backends.items()
+                for backend in backends
+            ])
+
+    async def _probe(self, service: str, backend: Backend):
+        try:
+            response = await self.pool.get_client(service).get(f"{backend.url}/health", timeout=GATEWAY_HEALTH_TIMEOUT)
+            backend.record_probe(response.status_code == 200)
+        except Exception:
+            backend.record_probe(False)
+
+    def stats(self) -> dict:
+        return {
+            service: [
+                {
+                    "url": backend.url,
+                    "healthy": backend.healthy,
+                    "outstanding": backend.outstanding,
+                    "requests": backend.requests,
+                }
+                for backend in backends
+            ]
+            for service, backends in self.backends.items()
+        }
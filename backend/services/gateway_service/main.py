@@ -1,8 +1,62 @@
+import math
+import time
 import httpx
-from fastapi import FastAPI, Request, Response
+from fastapi import APIRouter, Depends, FastAPI, Request, Response, WebSocket
+from fastapi.responses import JSONResponse
 from fastapi.middleware.cors import CORSMiddleware
+from contextlib import asynccontextmanager
+from backend.services.gateway_service.connection_pool import UpstreamPool, GATEWAY_DEADLINE, DEADLINE_BUDGETS, EVENT_STREAM_PATHS
+from backend.services.gateway_service.proxy import BodyTooLargeError, proxy_request, release_on_close, send_buffered, send_streaming, buffered_response
+from backend.services.gateway_service.coalescing import single_flight, coalescing_key
+from backend.services.gateway_service.circuit_breaker import UpstreamGuards, UpstreamUnavailableError
+from backend.services.gateway_service.load_balancer import LoadBalancer, load_service_backends
+from backend.services.gateway_service.response_cache import response_cache, WRITE_METHODS
+from backend.services.gateway_service.compression import CompressionMiddleware
+from backend.services.gateway_service.rate_limiter import rate_limiter
+from backend.services.gateway_service.websocket_proxy import websocket_proxy
+from backend.services.gateway_service.hedging import hedger
+from backend.services.gateway_service.bff import DASHBOARD_CALLS, FORWARDED_HEADERS, UpstreamCall, aggregate
+from backend.shared.redis_client import close_redis
+from backend.shared.metrics import instrument_app, observe_upstream
+from backend.shared.deadline import DeadlineMiddleware
+from backend.shared import auth
 
-app = FastAPI(title="API Gateway")
+SERVICES = load_service_backends({
+    "orders": ["http://localhost:8001"],
+    "returns": ["http://localhost:8002"],
+    "inventory": ["http://localhost:8003"],
+    "tickets": ["http://localhost:8004"],
+    "chatbot": ["http://localhost:8005"],
+    "salesforce": ["http://localhost:8006"],
+    "notifications": ["http://localhost:8007"],
+    "analytics": ["http://localhost:8008"],
+})
+
+upstream_pool = UpstreamPool(SERVICES)
+upstream_guards = UpstreamGuards(SERVICES)
+load_balancer = LoadBalancer(SERVICES)
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Keep-alive clients and replica health checks live for the lifetime of the gateway
+    await upstream_pool.start()
+    await load_balancer.start(upstream_pool)
+    yield
+    await load_balancer.close()
+    await upstream_pool.close()
+    await close_redis()
+
+app = FastAPI(title="API Gateway", lifespan=lifespan)
+
+# Every request gets a deadline here; the services behind the gateway inherit what is left of it
+app.add_middleware(
+    DeadlineMiddleware,
+    default_budget=GATEWAY_DEADLINE,
+    budgets={f"/api/{service}/": seconds for service, seconds in DEADLINE_BUDGETS.items()},
+    exempt=EVENT_STREAM_PATHS,
+)
+
+instrument_app(app, "gateway")
 
 app.add_middleware(
     CORSMiddleware,
@@ -10,50 +64,199 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    # Order listing pagination headers, readable by the frontend
+    expose_headers=["X-Next-Cursor", "X-Total-Count"],
 )
 
-SERVICES = {
-    "orders": "http://localhost:8001",
-    "returns": "http://localhost:8002",
-    "inventory": "http://localhost:8003",
-    "tickets": "http://localhost:8004",
-    "chatbot": "http://localhost:8005",
-    "salesforce": "http://localhost:8006",
-    "notifications": "http://localhost:8007",
-    "analytics": "http://localhost:8008",
-}
+app.add_middleware(CompressionMiddleware)
+
+async def call_upstream(service: str, method: str, send):
+    """Send to a healthy replica of the service, through its circuit breaker and bulkhead"""
+    start = time.perf_counter()
+    status = "error"
+    try:
+        response = await upstream_guards.call(service, lambda: load_balancer.call(service, send))
+        status = str(response.status_code)
+        return response
+    except UpstreamUnavailableError:
+        status = "rejected"
+        raise
+    finally:
+        observe_upstream("gateway", service, method, status, time.perf_counter() - start)
+
+def rate_limited(decision) -> Response:
+    return Response(
+        content=f"Rate limit exceeded ({decision.rule.name})",
+        status_code=429,
+        headers={
+            "Retry-After": str(max(1, math.ceil(decision.retry_after))),
+            "X-RateLimit-Limit": str(decision.rule.capacity),
+            "X-RateLimit-Remaining": str(int(decision.remaining)),
+        },
+    )
+
+# Registered before the catch-all proxy route, which would otherwise claim /api/bff/...
+@app.get("/api/bff/dashboard")
+async def bff_dashboard(request: Request):
+    decision = await rate_limiter.check(request)
+    if not decision.allowed:
+        return rate_limited(decision)
+
+    headers = {name: request.headers[name] for name in FORWARDED_HEADERS if name in request.headers}
+
+    def fetch(call: UpstreamCall):
+        client = upstream_pool.get_client(call.service)
+        return call_upstream(
+            call.service, "GET",
+            lambda base_url: client.get(base_url + call.path, params=call.params, headers=headers),
+        )
+
+    result = await aggregate(DASHBOARD_CALLS, fetch)
+    status_code = 200
+    if not result["data"]:
+        # Nothing to render: surface auth failures as such so the frontend can redirect to login
+        statuses = {error.get("status") for error in result["errors"].values()}
+        status_code = 401 if 401 in statuses else 502
+    return JSONResponse(content=result, status_code=status_code)
 
 @app.api_route("/api/{service}/{path:path}", methods=["GET", "POST", "PUT", "DELETE", "PATCH"])
 async def gateway(service: str, path: str, request: Request):
     if service not in SERVICES:
         return Response(content="Service not found", status_code=404)
 
-    url = f"{SERVICES[service]}/api/{service}/{path}"
+    decision = await rate_limiter.check(request)
+    if not decision.allowed:
+        return rate_limited(decision)
+
+    url = f"/api/{service}/{path}"
     
     # Forward query params
     params = dict(request.query_params)
     
-    # Increase timeout for AI services
-    async with httpx.AsyncClient(timeout=60.0) as client:
-        try:
-            # Forward body if present
-            body = await request.body()
-            
-            response = await client.request(
-                method=request.method,
-                url=url,
-                content=body,
-                params=params,
-                headers=request.headers.raw
-            )
-            
-            return Response(
-                content=response.content,
-                status_code=response.status_code,
-                headers=dict(response.headers)
-            )
-        except Exception as e:
-            return Response(content=str(e), status_code=500)
+    client = upstream_pool.get_client(service)
+
+    def guarded_fetch():
+        def attempt():
+            return call_upstream(service, request.method, lambda base_url: send_buffered(client, request, base_url + url, params))
+        if hedger.should_hedge(service, request):
+            return hedger.call(service, attempt)
+        return attempt()
+
+    async def fetch():
+        if single_flight.should_coalesce(service, request):
+            # Identical concurrent GETs share a single upstream call
+            return await single_flight.do(coalescing_key(service, request), guarded_fetch)
+        return await guarded_fetch()
+
+    async def fetch_for_cache():
+        if single_flight.should_coalesce(service, request) or hedger.should_hedge(service, request):
+            return await fetch()
+        # Headers only: the cache reads the body just when it is small enough to keep
+        return await call_upstream(service, request.method, lambda base_url: send_streaming(client, request, base_url + url, params))
+
+    async def open_event_stream(base_url: str) -> Response:
+        response = await proxy_request(upstream_pool.get_stream_client(service), request, base_url + url, params, stream=True)
+        # Like WebSockets, a stream counts as outstanding on its replica for as long as it stays open
+        return release_on_close(response, load_balancer.hold(service, base_url))
+
+    try:
+        if url in EVENT_STREAM_PATHS:
+            # Change feeds stay open indefinitely: never cache, share or buffer them
+            return await call_upstream(service, request.method, open_event_stream)
+        if response_cache.is_cacheable(service, request):
+            return await response_cache.serve(service, request, fetch_for_cache)
+        if single_flight.should_coalesce(service, request) or hedger.should_hedge(service, request):
+            # Sharing or racing a response needs all of it in hand, so these are buffered
+            return buffered_response(await fetch())
+
+        # Stream the body through in both directions instead of buffering it in the gateway
+        response = await call_upstream(service, request.method, lambda base_url: proxy_request(client, request, base_url + url, params))
+        if request.method in WRITE_METHODS:
+            await response_cache.invalidate(service)
+        return response
+    except UpstreamUnavailableError as e:
+        # Fail fast instead of queueing behind a struggling upstream
+        return Response(
+            content=str(e),
+            status_code=503,
+            headers={"Retry-After": str(max(1, int(e.retry_after)))},
+        )
+    except httpx.TimeoutException:
+        return Response(content=f"Upstream {service} timed out", status_code=504)
+    except BodyTooLargeError as e:
+        return Response(content=str(e), status_code=413)
+    except Exception as e:
+        return Response(content=str(e), status_code=500)
+
+@app.websocket("/api/{service}/{path:path}")
+async def websocket_gateway(websocket: WebSocket, service: str, path: str):
+    if service not in SERVICES:
+        await websocket.close(code=1008)
+        return
+    if websocket_proxy.at_capacity():
+        await websocket.close(code=1013)  # Try again later
+        return
+
+    # Long-lived sockets count as outstanding requests, so replicas share them evenly
+    backend = load_balancer.choose(service)
+    upstream_url = backend.url.replace("http", "ws", 1) + f"/api/{service}/{path}"
+    if websocket.url.query:
+        upstream_url += f"?{websocket.url.query}"
+
+    backend.outstanding += 1
+    try:
+        await websocket_proxy.relay(websocket, service, upstream_url)
+    finally:
+        backend.outstanding -= 1
+
+# Pool, cache and breaker internals, and the controls to reset them: admins only
+admin = APIRouter(prefix="/admin", dependencies=[Depends(auth.get_current_admin)])
+
+@admin.get("/pools")
+async def pool_stats():
+    return upstream_pool.stats()
+
+@admin.get("/cache")
+async def cache_stats():
+    return response_cache.stats()
+
+@admin.get("/coalescing")
+async def coalescing_stats():
+    return single_flight.stats()
+
+@admin.get("/upstreams")
+async def upstream_stats():
+    return load_balancer.stats()
+
+@admin.get("/hedging")
+async def hedging_stats():
+    return hedger.stats()
+
+@admin.get("/websockets")
+async def websocket_stats():
+    return websocket_proxy.stats()
+
+@admin.get("/ratelimits")
+async def rate_limit_stats():
+    return rate_limiter.stats()
+
+@admin.get("/breakers")
+async def breaker_stats():
+    return upstream_guards.stats()
+
+@admin.post("/breakers/{service}/reset")
+async def reset_breaker(service: str):
+    if service not in SERVICES:
+        return Response(content="Service not found", status_code=404)
+    upstream_guards.reset(service)
+    return {"reset": service}
+
+@admin.delete("/cache/{service}")
+async def invalidate_cache(service: str):
+    await response_cache.invalidate(service)
+    return {"invalidated": service}
+
+app.include_router(admin)
 
 if __name__ == "__main__":
     import uvicorn
@@ -0,0 +1,146 @@
+import os
+import hashlib
+import httpx
+from typing import AsyncIterator, Callable, Optional
+from fastapi import Request, Response
+from fastapi.responses import StreamingResponse
+from starlette.background import BackgroundTask
+from dotenv import load_dotenv
+
+load_dotenv()
+
+GATEWAY_STREAMING = os.getenv("GATEWAY_STREAMING", "true").lower() == "true"
+GATEWAY_MAX_BODY_SIZE = int(os.getenv("GATEWAY_MAX_BODY_SIZE", 10 * 1024 * 1024))  # 10 MB
+
+# Connection-level headers that must not be forwarded by a proxy (RFC 9110 section 7.6.1)
+HOP_BY_HOP_HEADERS = {
+    "connection",
+    "keep-alive",
+    "proxy-authenticate",
+    "proxy-authorization",
+    "te",
+    "trailer",
+    "transfer-encoding",
+    "upgrade",
+}
+
+class BodyTooLargeError(Exception):
+    pass
+
+def upstream_headers(request: Request) -> list:
+    return [
+        (name, value) for name, value in request.headers.raw
+        if name.decode("latin-1").lower() not in HOP_BY_HOP_HEADERS
+    ]
+
+def downstream_headers(response: httpx.Response, decoded: bool = False) -> dict:
+    excluded = set(HOP_BY_HOP_HEADERS)
+    if decoded:
+        # httpx has already decompressed the body, so the upstream encoding and length no longer apply
+        excluded |= {"content-encoding", "content-length"}
+    return {name: value for name, value in response.headers.items() if name.lower() not in excluded}
+
+def auth_scope(request: Request) -> str:
+    """Short hash of the caller's credentials, so per-user responses are never shared between users"""
+    auth = request.headers.get("authorization", "")
+    return hashlib.sha1(auth.encode()).hexdigest()[:16] if auth else "anon"
+
+def has_body(request: Request) -> bool:
+    return "content-length" in request.headers or "transfer-encoding" in request.headers
+
+async def limited_body(request: Request):
+    """Pipe the client body upstream chunk by chunk, enforcing the size cap as it arrives"""
+    received = 0
+    async for chunk in request.stream():
+        received += len(chunk)
+        if received > GATEWAY_MAX_BODY_SIZE:
+            raise BodyTooLargeError(f"Request body exceeds {GATEWAY_MAX_BODY_SIZE} bytes")
+        yield chunk
+
+async def proxy_request(client: httpx.AsyncClient, request: Request, url: str, params: dict, stream: Optional[bool] = None) -> Response:
+    """stream overrides GATEWAY_STREAMING, e.g. for event streams that never finish"""
+    content_length = request.headers.get("content-length")
+    if content_length and content_length.isdigit() and int(content_length) > GATEWAY_MAX_BODY_SIZE:
+        return Response(content="Request body too large", status_code=413)
+
+    try:
+        if stream is None:
+            stream = GATEWAY_STREAMING
+        if stream:
+            return await _stream(client, request, url, params)
+        return await _buffered(client, request, url, params)
+    except BodyTooLargeError as e:
+        return Response(content=str(e), status_code=413)
+
+async def _stream(client: httpx.AsyncClient, request: Request, url: str, params: dict) -> Response:
+    return streamed_response(await send_streaming(client, request, url, params))
+
+async def send_streaming(client: httpx.AsyncClient, request: Request, url: str, params: dict) -> httpx.Response:
+    """Returns once the upstream's headers arrive; the body is left unread"""
+    upstream_request = client.build_request(
+        method=request.method,
+        url=url,
+        content=limited_body(request) if has_body(request) else None,
+        params=params,
+        headers=upstream_headers(request),
+    )
+    return await client.send(upstream_request, stream=True)
+
+def streamed_response(response: httpx.Response) -> Response:
+    # Raw bytes keep the upstream content-encoding intact; the stream is closed once fully sent
+    return StreamingResponse(
+        response.aiter_raw(),
+        status_code=response.status_code,
+        headers=downstream_headers(response),
+        background=BackgroundTask(response.aclose),
+    )
+
+async def send_buffered(client: httpx.AsyncClient, request: Request, url: str, params: dict) -> httpx.Response:
+    body = await request.body()
+    if len(body) > GATEWAY_MAX_BODY_SIZE:
+        raise BodyTooLargeError(f"Request body exceeds {GATEWAY_MAX_BODY_SIZE} bytes")
+
+    return await client.request(
+        method=request.method,
+        url=url,
+        content=body,
+        params=params,
+        headers=upstream_headers(request),
+    )
+
+def release_on_close(response: Response, release: Callable[[], None]) -> Response:
+    """Call release once a streamed response is over: fully sent, abandoned by the client or failed"""
+    if not isinstance(response, StreamingResponse):
+        release()
+        return response
+
+    async def body(chunks: AsyncIterator[bytes]):
+        try:
+            async for chunk in chunks:
+                yield chunk
+        finally:
+            release()
+
+    background = response.background
+
+    async def finish():
+        # A client disconnect stops the body without closing it, so this runs too
+        try:
+            if background is not None:
+                await background()
+        finally:
+            release()
+
+    response.body_iterator = body(response.body_iterator)
+    response.background = BackgroundTask(finish)
+    return response
+
+def buffered_response(response: httpx.Response) -> Response:
+    return Response(
+        content=response.content,
+        status_code=response.status_code,
+        headers=downstream_headers(response, decoded=True),
+    )
+
+async def _buffered(client: httpx.AsyncClient, request: Request, url: str, params: dict) -> Response:
+    return buffered_response(await send_buffered(client, request, url, params))
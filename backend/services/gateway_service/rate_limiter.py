@@ -0,0 +1,191 @@
+import os
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+from fastapi import Request
+from jose import JWTError, jwt
+from dotenv import load_dotenv
+from backend.shared.auth import SECRET_KEY, ALGORITHM
+from backend.shared.logger import get_logger
+from backend.shared.redis_client import get_redis
+
+load_dotenv()
+logger = get_logger(__name__)
+
+GATEWAY_RATE_LIMIT_ENABLED = os.getenv("GATEWAY_RATE_LIMIT_ENABLED", "true").lower() == "true"
+GATEWAY_RATE_LIMIT_BACKEND = os.getenv("GATEWAY_RATE_LIMIT_BACKEND", "memory")  # "memory" or "redis"
+# Identities never limited: JWT subjects or client IPs, e.g. "admin@example.com,10.0.0.12"
+GATEWAY_RATE_LIMIT_EXEMPT = {
+    identity.strip() for identity in os.getenv("GATEWAY_RATE_LIMIT_EXEMPT", "").split(",") if identity.strip()
+}
+GATEWAY_TRUST_FORWARDED_FOR = os.getenv("GATEWAY_TRUST_FORWARDED_FOR", "false").lower() == "true"
+
+@dataclass
+class RateLimitRule:
+    name: str
+    method: Optional[str]  # None matches any method
+    path_prefix: str
+    capacity: int  # burst size
+    refill_rate: float  # tokens per second, i.e. the sustained rate
+
+    def matches(self, request: Request) -> bool:
+        if self.method and request.method != self.method:
+            return False
+        return request.url.path.startswith(self.path_prefix)
+
+# Every matching rule must have a token; the route rules protect the expensive LLM and DB paths
+RATE_LIMIT_RULES = [
+    RateLimitRule("chat", "POST", "/api/chatbot/chat", capacity=5, refill_rate=0.2),
+    RateLimitRule("order_bulk_create", "POST", "/api/orders/bulk", capacity=5, refill_rate=0.5),
+    RateLimitRule("order_create", "POST", "/api/orders/", capacity=20, refill_rate=2.0),
+    RateLimitRule("return_create", "POST", "/api/returns/", capacity=10, refill_rate=1.0),
+    RateLimitRule("global", None, "/api/", capacity=200, refill_rate=50.0),
+]
+
+class MemoryBucketStore:
+    max_buckets = 100_000
+
+    def __init__(self):
+        # key -> (tokens, last refill, when it will be full again), least recently used first
+        self.buckets: "OrderedDict[str, Tuple[float, float, float]]" = OrderedDict()
+        self.evictions = 0
+
+    async def take(self, key: str, rule: RateLimitRule) -> Tuple[bool, float, float]:
+        now = time.monotonic()
+        state = self.buckets.get(key)
+        if state is None:
+            tokens, updated_at = rule.capacity, now
+        else:
+            tokens, updated_at, _ = state
+            self.buckets.move_to_end(key)
+        tokens = min(rule.capacity, tokens + (now - updated_at) * rule.refill_rate)
+        allowed = tokens >= 1
+        if allowed:
+            tokens -= 1
+        self.buckets[key] = (tokens, now, now + (rule.capacity - tokens) / rule.refill_rate)
+        if state is None and len(self.buckets) > self.max_buckets:
+            self._prune(now)
+        if allowed:
+            return True, tokens, 0.0
+        return False, tokens, (1 - tokens) / rule.refill_rate
+
+    def _prune(self, now: float):
+        # Buckets that have refilled completely are equivalent to new ones, so dropping them changes nothing
+        for key in [key for key, (_, _, full_at) in self.buckets.items() if full_at <= now]:
+            del self.buckets[key]
+        # Still too many active clients: forget the least recently seen. Pruning to below the cap
+        # leaves headroom, so this full scan runs once per many new keys rather than on every one.
+        target = int(self.max_buckets * 0.9)
+        while len(self.buckets) > target:
+            self.buckets.popitem(last=False)
+            self.evictions += 1
+
+# Refill and take in one atomic step, on the Redis clock so every gateway replica agrees
+TOKEN_BUCKET_LUA = """
+local capacity = tonumber(ARGV[1])
+local rate = tonumber(ARGV[2])
+local clock = redis.call('TIME')
+local now = tonumber(clock[1]) + tonumber(clock[2]) / 1000000
+local state = redis.call('HMGET', KEYS[1], 'tokens', 'ts')
+local tokens = tonumber(state[1]) or capacity
+local ts = tonumber(state[2]) or now
+tokens = math.min(capacity, tokens + math.max(0, now - ts) * rate)
+local allowed = 0
+local retry_after = 0
+if tokens >= 1 then
+    tokens = tokens - 1
+    allowed = 1
+else
+    retry_after = (1 - tokens) / rate
+end
+redis.call('HSET', KEYS[1], 'tokens', tokens, 'ts', now)
+redis.call('EXPIRE', KEYS[1], math.ceil(capacity / rate) + 1)
+return {allowed, tostring(tokens), tostring(retry_after)}
+"""
+
+class RedisBucketStore:
+    prefix = "gateway:ratelimit"
+
+    def __init__(self):
+        self.script = None
+
+    async def take(self, key: str, rule: RateLimitRule) -> Tuple[bool, float, float]:
+        if self.script is None:
+            self.script = get_redis().register_script(TOKEN_BUCKET_LUA)
+        allowed, tokens, retry_after = await self.script(
+            keys=[f"{self.prefix}:{key}"], args=[rule.capacity, rule.refill_rate]
+        )
+        return bool(allowed), float(tokens), float(retry_after)
+
+@dataclass
+class RateLimitDecision:
+    allowed: bool
+    rule: Optional[RateLimitRule] = None
+    remaining: float = 0.0
+    retry_after: float = 0.0
+
+class RateLimiter:
+    def __init__(self, rules: List[RateLimitRule]):
+        self.rules = rules
+        self.store = RedisBucketStore() if GATEWAY_RATE_LIMIT_BACKEND == "redis" else MemoryBucketStore()
+        self.allowed: Dict[str, int] = {rule.name: 0 for rule in rules}
+        self.limited: Dict[str, int] = {rule.name: 0 for rule in rules}
+
+    def identity(self, request: Request) -> str:
+        auth = request.headers.get("authorization", "")
+        if auth.lower().startswith("bearer "):
+            try:
+                subject = jwt.decode(auth[7:], SECRET_KEY, algorithms=[ALGORITHM]).get("sub")
+                if subject:
+                    return f"user:{subject}"
+            except JWTError:
+                pass
+        forwarded = request.headers.get("x-forwarded-for") if GATEWAY_TRUST_FORWARDED_FOR else None
+        ip = forwarded.split(",")[0].strip() if forwarded else (request.client.host if request.client else "unknown")
+        return f"ip:{ip}"
+
+    def is_exempt(self, identity: str) -> bool:
+        return identity.split(":", 1)[1] in GATEWAY_RATE_LIMIT_EXEMPT
+
+    async def check(self, request: Request) -> RateLimitDecision:
+        if not GATEWAY_RATE_LIMIT_ENABLED:
+            return RateLimitDecision(allowed=True)
+        identity = self.identity(request)
+        if self.is_exempt(identity):
+            return RateLimitDecision(allowed=True)
+
+        for rule in self.rules:
+            if not rule.matches(request):
+                continue
+            try:
+                allowed, remaining, retry_after = await self.store.take(f"{rule.name}:{identity}", rule)
+            except Exception as e:
+                # A limiter outage must not take the API down with it
+                logger.error(f"Rate limiter store failed, allowing request: {str(e)}")
+                return RateLimitDecision(allowed=True)
+            if not allowed:
+                self.limited[rule.name] += 1
+                return RateLimitDecision(allowed=False, rule=rule, remaining=remaining, retry_after=retry_after)
+            self.allowed[rule.name] += 1
+        return RateLimitDecision(allowed=True)
+
+    def stats(self) -> dict:
+        return {
+            "backend": GATEWAY_RATE_LIMIT_BACKEND,
+            "exempt": sorted(GATEWAY_RATE_LIMIT_EXEMPT),
+            **({"buckets": len(self.store.buckets), "evictions": self.store.evictions} if isinstance(self.store, MemoryBucketStore) else {}),
+            "rules": {
+                rule.name: {
+                    "method": rule.method,
+                    "path_prefix": rule.path_prefix,
+                    "capacity": rule.capacity,
+                    "refill_rate": rule.refill_rate,
+                    "allowed": self.allowed[rule.name],
+                    "limited": self.limited[rule.name],
+                }
+                for rule in self.rules
+            },
+        }
+
+rate_limiter = RateLimiter(RATE_LIMIT_RULES)
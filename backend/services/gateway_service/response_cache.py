@@ -0,0 +1,295 @@
+import os
+import json
+import time
+import base64
+import hashlib
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Awaitable, Callable, Dict, Optional, Union
+import httpx
+from fastapi import Request, Response
+from dotenv import load_dotenv
+from backend.shared.logger import get_logger
+from backend.shared.redis_client import get_redis
+from backend.services.gateway_service.proxy import auth_scope, buffered_response, downstream_headers, streamed_response
+from backend.services.gateway_service.coalescing import GATEWAY_COALESCING_ENABLED, single_flight
+
+load_dotenv()
+logger = get_logger(__name__)
+
+GATEWAY_CACHE_ENABLED = os.getenv("GATEWAY_CACHE_ENABLED", "true").lower() == "true"
+GATEWAY_CACHE_BACKEND = os.getenv("GATEWAY_CACHE_BACKEND", "memory")  # "memory" or "redis"
+GATEWAY_CACHE_MAX_BYTES = int(os.getenv("GATEWAY_CACHE_MAX_BYTES", 32 * 1024 * 1024))  # 32 MB
+GATEWAY_CACHE_MAX_ENTRY_BYTES = int(os.getenv("GATEWAY_CACHE_MAX_ENTRY_BYTES", 2 * 1024 * 1024))  # 2 MB
+
+# Seconds a GET response stays fresh, per service. Services not listed are never cached.
+CACHE_TTL_RULES = {
+    "inventory": 30,
+    "orders": 5,
+    "returns": 10,
+    "analytics": 60,
+}
+
+# A write to the key service also makes cached reads of these services stale
+INVALIDATION_RULES = {
+    "orders": ["orders", "inventory", "analytics"],
+    "returns": ["returns", "orders", "analytics"],
+    "inventory": ["inventory", "analytics"],
+}
+
+WRITE_METHODS = {"POST", "PUT", "PATCH", "DELETE"}
+
+def _load_ttl_overrides():
+    # e.g. GATEWAY_CACHE_TTLS="inventory=60,orders=0"
+    for rule in filter(None, os.getenv("GATEWAY_CACHE_TTLS", "").split(",")):
+        service, _, ttl = rule.partition("=")
+        CACHE_TTL_RULES[service.strip()] = int(ttl)
+
+_load_ttl_overrides()
+
+@dataclass
+class CachedResponse:
+    status_code: int
+    headers: Dict[str, str]
+    body: bytes
+    etag: str
+    stored_at: float
+    expires_at: float
+
+    @property
+    def size(self) -> int:
+        return len(self.body)
+
+    def to_json(self) -> str:
+        data = self.__dict__.copy()
+        data["body"] = base64.b64encode(self.body).decode()
+        return json.dumps(data)
+
+    @classmethod
+    def from_json(cls, raw) -> "CachedResponse":
+        data = json.loads(raw)
+        data["body"] = base64.b64decode(data["body"])
+        return cls(**data)
+
+class MemoryCacheBackend:
+    """LRU bounded by total body bytes rather than entry count"""
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self.current_bytes = 0
+        self.entries: "OrderedDict[str, CachedResponse]" = OrderedDict()
+        self.evictions = 0
+
+    async def get(self, key: str) -> Optional[CachedResponse]:
+        entry = self.entries.get(key)
+        if entry is None:
+            return None
+        if entry.expires_at <= time.time():
+            self._remove(key)
+            return None
+        self.entries.move_to_end(key)
+        return entry
+
+    async def set(self, key: str, entry: CachedResponse, ttl: int):
+        if key in self.entries:
+            self._remove(key)
+        self.entries[key] = entry
+        self.current_bytes += entry.size
+        while self.current_bytes > self.max_bytes and self.entries:
+            self._remove(next(iter(self.entries)))
+            self.evictions += 1
+
+    async def invalidate(self, service: str):
+        prefix = f"{service}:"
+        for key in [key for key in self.entries if key.startswith(prefix)]:
+            self._remove(key)
+
+    def _remove(self, key: str):
+        entry = self.entries.pop(key)
+        self.current_bytes -= entry.size
+
+    def stats(self) -> dict:
+        return {
+            "backend": "memory",
+            "entries": len(self.entries),
+            "bytes": self.current_bytes,
+            "max_bytes": self.max_bytes,
+            "evictions": self.evictions,
+        }
+
+class RedisCacheBackend:
+    """Shared cache across gateway replicas; a per-service generation counter makes invalidation O(1)"""
+
+    prefix = "gateway:cache"
+
+    async def _generation(self, service: str) -> int:
+        value = await get_redis().get(f"{self.prefix}:gen:{service}")
+        return int(value or 0)
+
+    async def _versioned_key(self, key: str) -> str:
+        service = key.split(":", 1)[0]
+        return f"{self.prefix}:{service}:{await self._generation(service)}:{key}"
+
+    async def get(self, key: str) -> Optional[CachedResponse]:
+        raw = await get_redis().get(await self._versioned_key(key))
+        return CachedResponse.from_json(raw) if raw else None
+
+    async def set(self, key: str, entry: CachedResponse, ttl: int):
+        await get_redis().set(await self._versioned_key(key), entry.to_json(), ex=ttl)
+
+    async def invalidate(self, service: str):
+        await get_redis().incr(f"{self.prefix}:gen:{service}")
+
+    def stats(self) -> dict:
+        return {"backend": "redis"}
+
+def make_etag(body: bytes) -> str:
+    return '"' + hashlib.sha1(body).hexdigest() + '"'
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    # Weak comparison, as required for If-None-Match
+    candidates = [tag.strip().removeprefix("W/") for tag in if_none_match.split(",")]
+    return etag.removeprefix("W/") in candidates
+
+class ResponseCache:
+    def __init__(self):
+        self.backend = RedisCacheBackend() if GATEWAY_CACHE_BACKEND == "redis" else MemoryCacheBackend(GATEWAY_CACHE_MAX_BYTES)
+        self.hits = 0
+        self.misses = 0
+        self.not_modified = 0
+        self.invalidations = 0
+        self.streamed = 0  # misses passed through uncached
+
+    def is_cacheable(self, service: str, request: Request) -> bool:
+        if not GATEWAY_CACHE_ENABLED or request.method != "GET":
+            return False
+        if CACHE_TTL_RULES.get(service, 0) <= 0:
+            return False
+        return "no-cache" not in request.headers.get("cache-control", "")
+
+    def cache_key(self, service: str, request: Request) -> str:
+        query = "&".join(sorted(f"{k}={v}" for k, v in request.query_params.multi_items()))
+        # Responses can differ per caller, so the credentials are part of the key
+        return f"{service}:{request.url.path}?{query}:{auth_scope(request)}"
+
+    async def serve(
+        self,
+        service: str,
+        request: Request,
+        fetch: Callable[[], Awaitable[httpx.Response]],
+    ) -> Response:
+        key = self.cache_key(service, request)
+        entry = await self._get(key)
+        if entry is not None:
+            self.hits += 1
+            return self._respond(entry, request, "HIT")
+
+        self.misses += 1
+        if GATEWAY_COALESCING_ENABLED:
+            # Concurrent misses on a key share one upstream fetch, so an entry expiring doesn't stampede the service
+            result, leader = await single_flight.join(f"cache:{key}", lambda: self._fill(key, service, fetch))
+        else:
+            result, leader = await self._fill(key, service, fetch), True
+        if isinstance(result, CachedResponse):
+            return self._respond(result, request, "MISS")
+        if not leader and not result.is_stream_consumed:
+            # A stream has a single reader: the callers that joined in fetch their own
+            result = await fetch()
+        if result.is_stream_consumed:
+            return buffered_response(result)
+        self.streamed += 1
+        return streamed_response(result)
+
+    async def _fill(
+        self,
+        key: str,
+        service: str,
+        fetch: Callable[[], Awaitable[httpx.Response]],
+    ) -> Union[CachedResponse, httpx.Response]:
+        """The new entry, or the upstream response when it can't be cached: read in full when it was
+        small enough to try, unread when it is too large to keep or of unknown length"""
+        upstream = await fetch()
+        if not upstream.is_stream_consumed and not self._fits(upstream):
+            return upstream
+        await upstream.aread()
+        entry = self._build_entry(upstream, CACHE_TTL_RULES[service])
+        if entry is None:
+            return upstream
+
+        if entry.size <= GATEWAY_CACHE_MAX_ENTRY_BYTES:
+            await self._set(key, entry, CACHE_TTL_RULES[service])
+        return entry
+
+    async def invalidate(self, service: str):
+        for target in INVALIDATION_RULES.get(service, [service]):
+            try:
+                await self.backend.invalidate(target)
+                self.invalidations += 1
+            except Exception as e:
+                logger.error(f"Cache invalidation failed for {target}: {str(e)}")
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            **self.backend.stats(),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / lookups, 3) if lookups else 0.0,
+            "not_modified": self.not_modified,
+            "streamed": self.streamed,
+            "invalidations": self.invalidations,
+            "ttl_rules": CACHE_TTL_RULES,
+        }
+
+    async def _get(self, key: str) -> Optional[CachedResponse]:
+        # A cache outage must never fail the request, it just becomes a miss
+        try:
+            return await self.backend.get(key)
+        except Exception as e:
+            logger.error(f"Cache read failed: {str(e)}")
+            return None
+
+    async def _set(self, key: str, entry: CachedResponse, ttl: int):
+        try:
+            await self.backend.set(key, entry, ttl)
+        except Exception as e:
+            logger.error(f"Cache write failed: {str(e)}")
+
+    def _fits(self, upstream: httpx.Response) -> bool:
+        """Decided from the headers alone, before any of the body is read"""
+        length = upstream.headers.get("content-length", "")
+        return upstream.status_code == 200 and length.isdigit() and int(length) <= GATEWAY_CACHE_MAX_ENTRY_BYTES
+
+    def _build_entry(self, upstream: httpx.Response, ttl: int) -> Optional[CachedResponse]:
+        cache_control = upstream.headers.get("cache-control", "")
+        if upstream.status_code != 200 or "no-store" in cache_control or "private" in cache_control:
+            return None
+        body = upstream.content
+        now = time.time()
+        return CachedResponse(
+            status_code=upstream.status_code,
+            headers=downstream_headers(upstream, decoded=True),
+            body=body,
+            etag=upstream.headers.get("etag") or make_etag(body),
+            stored_at=now,
+            expires_at=now + ttl,
+        )
+
+    def _respond(self, entry: CachedResponse, request: Request, cache_status: str) -> Response:
+        headers = {
+            **entry.headers,
+            "ETag": entry.etag,
+            "X-Cache": cache_status,
+            "Age": str(int(time.time() - entry.stored_at)),
+        }
+        if etag_matches(request.headers.get("if-none-match"), entry.etag):
+            self.not_modified += 1
+            headers.pop("content-type", None)
+            return Response(status_code=304, headers=headers)
+        return Response(content=entry.body, status_code=entry.status_code, headers=headers)
+
+response_cache = ResponseCache()
@@ -0,0 +1,112 @@
+import os
+import time
+import asyncio
+from typing import Dict
+from fastapi import WebSocket, WebSocketDisconnect
+from websockets.asyncio.client import connect
+from websockets.exceptions import ConnectionClosed
+from dotenv import load_dotenv
+from backend.shared.logger import get_logger
+from backend.shared.metrics import WEBSOCKET_CONNECTIONS, WEBSOCKET_MESSAGES
+
+load_dotenv()
+logger = get_logger(__name__)
+
+GATEWAY_WS_IDLE_TIMEOUT = float(os.getenv("GATEWAY_WS_IDLE_TIMEOUT", 300.0))
+GATEWAY_WS_MAX_MESSAGE_SIZE = int(os.getenv("GATEWAY_WS_MAX_MESSAGE_SIZE", 64 * 1024))  # 64 KB
+GATEWAY_WS_MAX_QUEUE = int(os.getenv("GATEWAY_WS_MAX_QUEUE", 16))  # upstream messages buffered per connection
+GATEWAY_WS_MAX_CONNECTIONS = int(os.getenv("GATEWAY_WS_MAX_CONNECTIONS", 10000))
+
+# Headers worth carrying over to the upstream handshake; websockets generates the rest
+FORWARDED_HEADERS = ("authorization", "cookie", "user-agent", "x-forwarded-for")
+
+class WebSocketProxy:
+    """Bidirectional WebSocket relay between a client and one upstream replica"""
+
+    def __init__(self):
+        self.active: Dict[str, int] = {}
+        self.total = 0
+
+    def at_capacity(self) -> bool:
+        return sum(self.active.values()) >= GATEWAY_WS_MAX_CONNECTIONS
+
+    async def relay(self, websocket: WebSocket, service: str, upstream_url: str):
+        headers = {name: websocket.headers[name] for name in FORWARDED_HEADERS if name in websocket.headers}
+        try:
+            upstream = await connect(
+                upstream_url,
+                additional_headers=headers,
+                max_size=GATEWAY_WS_MAX_MESSAGE_SIZE,
+                max_queue=GATEWAY_WS_MAX_QUEUE,
+                open_timeout=10,
+            )
+        except Exception as e:
+            logger.error(f"WebSocket upstream connect to {upstream_url} failed: {str(e)}")
+            await websocket.close(code=1011)
+            return
+
+        await websocket.accept()
+        self.active[service] = self.active.get(service, 0) + 1
+        self.total += 1
+        WEBSOCKET_CONNECTIONS.labels(service).inc()
+        last_activity = time.monotonic()
+
+        async def client_to_upstream():
+            nonlocal last_activity
+            while True:
+                message = await websocket.receive()
+                if message["type"] == "websocket.disconnect":
+                    return
+                data = message.get("text") if message.get("text") is not None else message.get("bytes")
+                if data is None:
+                    continue
+                if len(data) > GATEWAY_WS_MAX_MESSAGE_SIZE:
+                    await websocket.close(code=1009)  # Message too big
+                    return
+                last_activity = time.monotonic()
+                WEBSOCKET_MESSAGES.labels(service, "upstream").inc()
+                await upstream.send(data)
+
+        async def upstream_to_client():
+            nonlocal last_activity
+            async for data in upstream:
+                last_activity = time.monotonic()
+                WEBSOCKET_MESSAGES.labels(service, "client").inc()
+                if isinstance(data, bytes):
+                    await websocket.send_bytes(data)
+                else:
+                    await websocket.send_text(data)
+
+        pumps = [asyncio.create_task(client_to_upstream()), asyncio.create_task(upstream_to_client())]
+        try:
+            while True:
+                remaining = GATEWAY_WS_IDLE_TIMEOUT - (time.monotonic() - last_activity)
+                if remaining <= 0:
+                    await websocket.close(code=1001, reason="Idle timeout")
+                    break
+                done, _ = await asyncio.wait(pumps, timeout=remaining, return_when=asyncio.FIRST_COMPLETED)
+                if done:
+                    break
+        except (WebSocketDisconnect, ConnectionClosed):
+            pass
+        finally:
+            for pump in pumps:
+                pump.cancel()
+            self.active[service] -= 1
+            WEBSOCKET_CONNECTIONS.labels(service).dec()
+            await asyncio.gather(*pumps, return_exceptions=True)
+            await upstream.close()
+            try:
+                await websocket.close()
+            except RuntimeError:
+                pass  # Already closed by either side
+
+    def stats(self) -> dict:
+        return {
+            "active": self.active,
+            "total": self.total,
+            "max_connections": GATEWAY_WS_MAX_CONNECTIONS,
+            "idle_timeout": GATEWAY_WS_IDLE_TIMEOUT,
+        }
+
+websocket_proxy = WebSocketProxy()
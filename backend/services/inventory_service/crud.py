@@ -1,9 +1,16 @@
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
+from backend.shared.change_feed import record_changes
 from . import models, schemas
 
+def inventory_changed(db_inventory: models.Inventory, action: str) -> dict:
+    return {
+        "entity_id": db_inventory.id, "action": action, "status": db_inventory.stock_level.value,
+        "data": schemas.Inventory.model_validate(db_inventory).model_dump(mode="json"),
+    }
+
 async def get_inventory(db: AsyncSession, product_id: int):
-    result = await db.execute(select(models.Inventory).where(models.Inventory.product_id == product_id))
+    result = await db.execute(select(models.Inventory).where(models.Inventory.id == product_id))
     return result.scalars().first()
 
 async def get_all_inventory(db: AsyncSession, skip: int = 0, limit: int = 100):
@@ -14,6 +21,8 @@ async def get_all_inventory(db: AsyncSession, skip: int = 0, limit: int = 100):
 async def create_inventory(db: AsyncSession, inventory: schemas.InventoryCreate):
     db_inventory = models.Inventory(**inventory.dict())
     db.add(db_inventory)
+    await db.flush()
+    await record_changes(db, "inventory", [inventory_changed(db_inventory, "created")])
     await db.commit()
     await db.refresh(db_inventory)
     return db_inventory
@@ -21,7 +30,9 @@ async def create_inventory(db: AsyncSession, inventory: schemas.InventoryCreate)
 async def update_stock(db: AsyncSession, product_id: int, quantity_change: int):
     db_inventory = await get_inventory(db, product_id)
     if db_inventory:
-        db_inventory.quantity += quantity_change
+        db_inventory.stock += quantity_change
+        await db.flush()
+        await record_changes(db, "inventory", [inventory_changed(db_inventory, "stock_changed")])
         await db.commit()
         await db.refresh(db_inventory)
     return db_inventory
@@ -1,6 +1,12 @@
 from sqlalchemy import Column, Integer, String, Float
+import enum
 from backend.shared.database import Base
 
+class StockLevel(str, enum.Enum):
+    IN_STOCK = "IN_STOCK"
+    LOW_STOCK = "LOW_STOCK"  # at or below the reorder threshold
+    OUT_OF_STOCK = "OUT_OF_STOCK"
+
 class Inventory(Base):
     __tablename__ = "inventory"
 
@@ -12,3 +18,11 @@ class Inventory(Base):
     category = Column(String, nullable=True)
     warehouse_location = Column(String, nullable=True)
     reorder_threshold = Column(Integer, default=10)
+
+    @property
+    def stock_level(self) -> StockLevel:
+        if self.stock <= 0:
+            return StockLevel.OUT_OF_STOCK
+        if self.stock <= self.reorder_threshold:
+            return StockLevel.LOW_STOCK
+        return StockLevel.IN_STOCK
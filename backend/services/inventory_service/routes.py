@@ -1,11 +1,16 @@
-from fastapi import APIRouter, Depends, HTTPException
+from typing import Optional
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
 from sqlalchemy.ext.asyncio import AsyncSession
-from backend.shared.database import get_db
+from backend.shared.database import get_db, get_read_db
 from backend.shared import auth
-from . import crud, schemas
+from backend.shared.change_feed import ChangeFeed
+from . import crud, schemas, models
 
 router = APIRouter()
 
+# Creations and stock changes, as Server-Sent Events
+feed = ChangeFeed("inventory")
+
 @router.post("/", response_model=schemas.Inventory)
 async def create_inventory_item(
     inventory: schemas.InventoryCreate, 
@@ -18,16 +23,26 @@ async def create_inventory_item(
 async def read_all_inventory(
     skip: int = 0,
     limit: int = 100,
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ):
     """Get all inventory items (unauthenticated for chatbot access)"""
     return await crud.get_all_inventory(db, skip=skip, limit=limit)
 
 
+# Declared before /{product_id}, which would otherwise claim the path with product_id="changes"
+@router.get("/changes")
+async def inventory_changes(
+    request: Request,
+    after: Optional[int] = Query(None, description="Event id to resume after, for clients that cannot send Last-Event-ID"),
+    status: Optional[models.StockLevel] = Query(None, description="e.g. LOW_STOCK to follow items that need reordering"),
+):
+    """Stream inventory changes as they commit instead of re-polling the listing"""
+    return feed.response(request, after, status=status.value if status else None)
+
 @router.get("/{product_id}", response_model=schemas.Inventory)
 async def read_inventory(
     product_id: int, 
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
     current_user: dict = Depends(auth.get_current_user)
 ):
     db_inventory = await crud.get_inventory(db, product_id=product_id)
@@ -1,8 +1,15 @@
 from fastapi import FastAPI
 from backend.services.notification_service import routes
+from backend.shared.metrics import instrument_app
+from backend.shared.deadline import DeadlineMiddleware
 
 app = FastAPI(title="Notification Service")
 
+# Stop working on requests whose caller has already given up
+app.add_middleware(DeadlineMiddleware)
+
+instrument_app(app, "notifications")
+
 app.include_router(routes.router, prefix="/api/notifications", tags=["notifications"])
 
 @app.get("/health")
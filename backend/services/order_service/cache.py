@@ -0,0 +1,150 @@
+import os
+import time
+from collections import OrderedDict
+from typing import Iterable, NamedTuple, Optional, Tuple
+from dotenv import load_dotenv
+from backend.shared.logger import get_logger
+from backend.shared.metrics import ORDER_CACHE_REQUESTS
+from backend.shared.redis_client import get_redis
+
+load_dotenv()
+logger = get_logger(__name__)
+
+ORDER_CACHE_ENABLED = os.getenv("ORDER_CACHE_ENABLED", "true").lower() == "true"
+ORDER_CACHE_MAX_ENTRIES = int(os.getenv("ORDER_CACHE_MAX_ENTRIES", 10_000))
+# Writes only clear this process's copy, so with several order-service processes this bounds how
+# long the others may serve a changed order from memory
+ORDER_CACHE_TTL = float(os.getenv("ORDER_CACHE_TTL", 5.0))
+# Second tier shared by every process; writes delete from it directly, so entries can live longer
+ORDER_CACHE_REDIS = os.getenv("ORDER_CACHE_REDIS", "false").lower() == "true"
+ORDER_CACHE_REDIS_TTL = int(os.getenv("ORDER_CACHE_REDIS_TTL", 300))
+
+# Fill only if no process has written the order since the read began, checked and set in one atomic step
+FILL_IF_UNCHANGED_LUA = """
+if tonumber(redis.call('GET', KEYS[2]) or '0') ~= tonumber(ARGV[2]) then
+    return 0
+end
+redis.call('SET', KEYS[1], ARGV[1], 'EX', ARGV[3])
+return 1
+"""
+
+class Lookup(NamedTuple):
+    """Taken before the database read on a miss, so set() can tell whether the order was written since"""
+    started: float  # time.monotonic()
+    version: Optional[int]  # the order's write counter in Redis, 0 if never written; None when unknown
+
+class OrderCache:
+    """Serialized schemas.Order payloads by order id: an in-process LRU in front of an optional Redis tier"""
+
+    redis_prefix = "orders:cache"
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self.entries: "OrderedDict[int, Tuple[bytes, float]]" = OrderedDict()  # id -> (payload, expires at)
+        # id -> when it was last written; a read that started before then must not be cached
+        self.invalidated: "OrderedDict[int, float]" = OrderedDict()
+        self.results = {"memory_hit": 0, "redis_hit": 0, "miss": 0}
+        self.fill_script = None
+
+    async def get(self, order_id: int) -> Tuple[Optional[bytes], Lookup]:
+        """The payload, or None on a miss; pass the Lookup on to set() once the order has been read"""
+        lookup = Lookup(time.monotonic(), None)
+        if not ORDER_CACHE_ENABLED:
+            return None, lookup
+        entry = self.entries.get(order_id)
+        if entry is not None:
+            if entry[1] > time.monotonic():
+                self.entries.move_to_end(order_id)
+                self._count("memory_hit")
+                return entry[0], lookup
+            del self.entries[order_id]
+        if ORDER_CACHE_REDIS:
+            payload, version = await self._redis_get(order_id)
+            if payload is not None:
+                self._remember(order_id, payload, ORDER_CACHE_TTL)
+                self._count("redis_hit")
+                return payload, lookup
+            lookup = lookup._replace(version=version)
+        self._count("miss")
+        return None, lookup
+
+    async def set(self, order_id: int, payload: bytes, lookup: Optional[Lookup] = None, ttl: Optional[float] = None):
+        """lookup comes from the get() that missed; leave it out for an order this request has just created.
+        ttl caps how long the payload is trusted."""
+        if not ORDER_CACHE_ENABLED:
+            return
+        if lookup is None:
+            lookup = Lookup(time.monotonic(), 0)
+        if self.invalidated.get(order_id, float("-inf")) >= lookup.started:
+            return  # Written while we were reading: the payload may already be stale
+        self._remember(order_id, payload, ORDER_CACHE_TTL if ttl is None else min(ttl, ORDER_CACHE_TTL))
+        if ORDER_CACHE_REDIS and lookup.version is not None:
+            # The check above only sees this process's writes; the version covers the others
+            await self._redis_set(order_id, payload, lookup.version, ORDER_CACHE_REDIS_TTL if ttl is None else max(1, int(ttl)))
+
+    async def invalidate(self, order_ids: Iterable[int]):
+        order_ids = list(order_ids)
+        now = time.monotonic()
+        for order_id in order_ids:
+            self.entries.pop(order_id, None)
+            self.invalidated[order_id] = now
+            self.invalidated.move_to_end(order_id)
+        while len(self.invalidated) > self.max_entries:
+            self.invalidated.popitem(last=False)
+        if ORDER_CACHE_REDIS and order_ids:
+            try:
+                pipe = get_redis().pipeline(transaction=True)
+                for order_id in order_ids:
+                    # Outlives any read in flight, which is all a version has to do
+                    pipe.incr(self._version_key(order_id))
+                    pipe.expire(self._version_key(order_id), ORDER_CACHE_REDIS_TTL)
+                pipe.delete(*[self._redis_key(order_id) for order_id in order_ids])
+                await pipe.execute()
+            except Exception as e:
+                logger.error(f"Order cache invalidation failed: {str(e)}")
+
+    def stats(self) -> dict:
+        lookups = sum(self.results.values())
+        hits = self.results["memory_hit"] + self.results["redis_hit"]
+        return {
+            "enabled": ORDER_CACHE_ENABLED,
+            "redis": ORDER_CACHE_REDIS,
+            "entries": len(self.entries),
+            **self.results,
+            "hit_ratio": round(hits / lookups, 3) if lookups else 0.0,
+        }
+
+    def _remember(self, order_id: int, payload: bytes, ttl: float):
+        self.entries[order_id] = (payload, time.monotonic() + ttl)
+        self.entries.move_to_end(order_id)
+        while len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+
+    def _count(self, result: str):
+        self.results[result] += 1
+        ORDER_CACHE_REQUESTS.labels(result).inc()
+
+    def _redis_key(self, order_id: int) -> str:
+        return f"{self.redis_prefix}:{order_id}"
+
+    def _version_key(self, order_id: int) -> str:
+        return f"{self.redis_prefix}:{order_id}:version"
+
+    async def _redis_get(self, order_id: int) -> Tuple[Optional[bytes], Optional[int]]:
+        # A cache outage must never fail the request, it just becomes a miss; with no version the fill is skipped
+        try:
+            payload, version = await get_redis().mget(self._redis_key(order_id), self._version_key(order_id))
+            return payload, int(version or 0)
+        except Exception as e:
+            logger.error(f"Order cache read failed: {str(e)}")
+            return None, None
+
+    async def _redis_set(self, order_id: int, payload: bytes, version: int, ttl: int):
+        try:
+            if self.fill_script is None:
+                self.fill_script = get_redis().register_script(FILL_IF_UNCHANGED_LUA)
+            await self.fill_script(keys=[self._redis_key(order_id), self._version_key(order_id)], args=[payload, version, ttl])
+        except Exception as e:
+            logger.error(f"Order cache write failed: {str(e)}")
+
+order_cache = OrderCache(ORDER_CACHE_MAX_ENTRIES)
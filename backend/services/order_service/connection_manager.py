@@ -0,0 +1,131 @@
+import os
+import asyncio
+from typing import Callable, Dict, Set
+from fastapi import WebSocket
+from dotenv import load_dotenv
+from backend.shared import messaging
+from backend.shared.logger import get_logger
+from backend.shared.metrics import WEBSOCKET_CONNECTIONS, WEBSOCKET_EVICTIONS
+
+load_dotenv()
+logger = get_logger(__name__)
+
+ORDER_WS_SEND_QUEUE = int(os.getenv("ORDER_WS_SEND_QUEUE", 32))  # updates buffered per socket before it counts as too slow
+ORDER_WS_SEND_TIMEOUT = float(os.getenv("ORDER_WS_SEND_TIMEOUT", 5.0))  # seconds one send may take
+# "local": updates reach sockets held by this process only, enough for a single worker.
+# "rabbitmq": updates are fanned out through RabbitMQ to every order-service process.
+ORDER_WS_FANOUT = os.getenv("ORDER_WS_FANOUT", "local")
+ORDER_UPDATES_EXCHANGE = "order_updates"
+
+# "Try Again Later": the client fell behind and is free to reconnect
+SLOW_CONSUMER_CLOSE_CODE = 1013
+
+class Subscriber:
+    """One socket with its own bounded outbox and sender task, so a slow client only ever delays itself"""
+
+    def __init__(self, websocket: WebSocket, order_id: int, evict: Callable[["Subscriber", str], None]):
+        self.websocket = websocket
+        self.order_id = order_id
+        self.outbox: asyncio.Queue = asyncio.Queue(maxsize=ORDER_WS_SEND_QUEUE)
+        self.evict = evict
+        self.sender = asyncio.create_task(self._drain())
+
+    def offer(self, message: str) -> bool:
+        try:
+            self.outbox.put_nowait(message)
+            return True
+        except asyncio.QueueFull:
+            return False
+
+    async def _drain(self):
+        try:
+            while True:
+                message = await self.outbox.get()
+                await asyncio.wait_for(self.websocket.send_text(message), timeout=ORDER_WS_SEND_TIMEOUT)
+        except asyncio.TimeoutError:
+            self.evict(self, "send_timeout")
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            # The socket is gone; forget it rather than waiting for its receive loop to notice
+            self.evict(self, "closed")
+
+class ConnectionManager:
+    """Order status subscribers: each update is queued on every matching socket without waiting on any of them"""
+
+    def __init__(self):
+        self.active_connections: Dict[int, Dict[WebSocket, Subscriber]] = {}
+        self.distributed = False  # True once subscribed to the RabbitMQ fan-out
+        self._closing: Set[asyncio.Task] = set()
+
+    async def start(self):
+        if ORDER_WS_FANOUT != "rabbitmq":
+            return
+        try:
+            await messaging.subscribe_events(ORDER_UPDATES_EXCHANGE, self._on_event)
+            self.distributed = True
+        except Exception as e:
+            logger.error(f"Order update fan-out unavailable, notifying this process's sockets only: {str(e)}")
+
+    async def stop(self):
+        for subscribers in list(self.active_connections.values()):
+            for subscriber in list(subscribers.values()):
+                self.disconnect(subscriber.websocket, subscriber.order_id)
+        if self.distributed:
+            await messaging.close_messaging()
+            self.distributed = False
+
+    async def connect(self, websocket: WebSocket, order_id: int):
+        await websocket.accept()
+        subscriber = Subscriber(websocket, order_id, self._evict)
+        self.active_connections.setdefault(order_id, {})[websocket] = subscriber
+        WEBSOCKET_CONNECTIONS.labels("orders").inc()
+
+    def disconnect(self, websocket: WebSocket, order_id: int):
+        subscribers = self.active_connections.get(order_id)
+        subscriber = subscribers.pop(websocket, None) if subscribers else None
+        if subscriber is None:
+            return  # Already evicted
+        if not subscribers:
+            del self.active_connections[order_id]
+        if subscriber.sender is not asyncio.current_task():
+            subscriber.sender.cancel()
+        WEBSOCKET_CONNECTIONS.labels("orders").dec()
+
+    async def broadcast(self, message: str, order_id: int):
+        await self.broadcast_many({order_id: message})
+
+    async def broadcast_many(self, messages: Dict[int, str]):
+        """One message per order, published once for the whole batch"""
+        if not messages:
+            return
+        event = {"messages": {str(order_id): message for order_id, message in messages.items()}}
+        if self.distributed and await messaging.broadcast_event(ORDER_UPDATES_EXCHANGE, event):
+            return  # Every process, this one included, delivers it from _on_event
+        self._deliver(messages)
+
+    async def _on_event(self, event: dict):
+        self._deliver({int(order_id): message for order_id, message in event["messages"].items()})
+
+    def _deliver(self, messages: Dict[int, str]):
+        for order_id, message in messages.items():
+            for subscriber in list(self.active_connections.get(order_id, {}).values()):
+                if not subscriber.offer(message):
+                    self._evict(subscriber, "queue_full")
+
+    def _evict(self, subscriber: Subscriber, reason: str):
+        if reason != "closed":
+            logger.warning(f"Dropping slow WebSocket subscriber of order {subscriber.order_id}: {reason}")
+            WEBSOCKET_EVICTIONS.labels("orders", reason).inc()
+            task = asyncio.create_task(self._close(subscriber.websocket))
+            self._closing.add(task)
+            task.add_done_callback(self._closing.discard)
+        self.disconnect(subscriber.websocket, subscriber.order_id)
+
+    async def _close(self, websocket: WebSocket):
+        try:
+            await asyncio.wait_for(websocket.close(code=SLOW_CONSUMER_CLOSE_CODE), timeout=ORDER_WS_SEND_TIMEOUT)
+        except Exception:
+            pass  # A client too slow to read updates may be too slow to take the close frame as well
+
+manager = ConnectionManager()
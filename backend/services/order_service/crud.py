@@ -1,8 +1,25 @@
+import base64
+from datetime import datetime
+from typing import List, Optional, Tuple
+from sqlalchemy import ARRAY, Integer, any_, bindparam, func, insert, tuple_, update
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
 from sqlalchemy.orm import selectinload
+from backend.shared.change_feed import record_changes
 from . import models, schemas
 
+def order_created(order_id: int, user_id: int, total_amount: float) -> dict:
+    return {
+        "entity_id": order_id, "action": "created", "user_id": user_id,
+        "status": models.OrderStatus.PENDING.value, "data": {"total_amount": total_amount},
+    }
+
+def order_status_changed(order_id: int, user_id: int, from_status: str, to_status: str) -> dict:
+    return {
+        "entity_id": order_id, "action": "status_changed", "user_id": user_id,
+        "status": to_status, "data": {"previous_status": from_status},
+    }
+
 async def get_order(db: AsyncSession, order_id: int):
     result = await db.execute(
         select(models.Order)
@@ -11,52 +28,146 @@ async def get_order(db: AsyncSession, order_id: int):
     )
     return result.scalars().first()
 
-async def get_orders(db: AsyncSession, skip: int = 0, limit: int = 100):
+def encode_cursor(order: models.Order) -> str:
+    """Opaque position just after this order in the newest-first listing"""
+    return base64.urlsafe_b64encode(f"{order.created_at.isoformat()}|{order.id}".encode()).decode()
+
+def decode_cursor(cursor: str) -> Tuple[datetime, int]:
+    """Raises ValueError for anything encode_cursor did not produce"""
+    try:
+        created_at, _, order_id = base64.urlsafe_b64decode(cursor.encode()).decode().partition("|")
+        return datetime.fromisoformat(created_at), int(order_id)
+    except (UnicodeError, ValueError, TypeError) as e:
+        raise ValueError(f"Invalid cursor: {cursor}") from e
+
+def _filter_orders(
+    query,
+    user_id: Optional[int] = None,
+    status: Optional[str] = None,
+    created_from: Optional[datetime] = None,
+    created_to: Optional[datetime] = None,
+):
+    if user_id is not None:
+        query = query.where(models.Order.user_id == user_id)
+    if status is not None:
+        query = query.where(models.Order.status == status)
+    if created_from is not None:
+        query = query.where(models.Order.created_at >= created_from)
+    if created_to is not None:
+        query = query.where(models.Order.created_at < created_to)
+    return query
+
+async def get_orders(
+    db: AsyncSession,
+    skip: int = 0,
+    limit: int = 100,
+    after: Optional[Tuple[datetime, int]] = None,
+    **filters,
+):
+    """Newest first. Pass the decoded cursor of the last order seen as `after` to get the next page:
+    it seeks straight to that (created_at, id) in the composite indexes, so page 1000 costs the
+    same as page 1, where `skip` has to read and discard every row before it."""
+    query = _filter_orders(select(models.Order), **filters)
+    if after is not None:
+        query = query.where(tuple_(models.Order.created_at, models.Order.id) < tuple_(*after))
     result = await db.execute(
-        select(models.Order)
+        query
         .options(selectinload(models.Order.items))
+        .order_by(models.Order.created_at.desc(), models.Order.id.desc())
         .offset(skip)
         .limit(limit)
     )
     return result.scalars().all()
 
+async def count_orders(db: AsyncSession, **filters) -> int:
+    result = await db.execute(_filter_orders(select(func.count()).select_from(models.Order), **filters))
+    return result.scalar_one()
+
 async def create_order(db: AsyncSession, order: schemas.OrderCreate):
     db_order = models.Order(
         user_id=order.user_id,
         total_amount=order.total_amount,
-        status=models.OrderStatus.PENDING.value
+        status=models.OrderStatus.PENDING.value,
+        items=[
+            models.OrderItem(product_id=item.product_id, quantity=item.quantity, price=item.price)
+            for item in order.items
+        ],
+        history=[
+            models.OrderStateHistory(from_status=None, to_status=models.OrderStatus.PENDING.value)
+        ],
     )
     db.add(db_order)
+    # One flush in one transaction: the order's INSERT ... RETURNING hands back its id and created_at,
+    # then all the items go in a single batched INSERT and the history row follows.
+    # Nothing is committed unless all of it succeeds, and the items are already loaded for serialization.
+    await db.flush()
+    await record_changes(db, "orders", [order_created(db_order.id, order.user_id, order.total_amount)])
     await db.commit()
-    await db.refresh(db_order)
+    return db_order
 
-    for item in order.items:
-        db_item = models.OrderItem(
-            order_id=db_order.id,
-            product_id=item.product_id,
-            quantity=item.quantity,
-            price=item.price
-        )
-        db.add(db_item)
-    
-    await db.commit()
-    
-    # Record history
-    history = models.OrderStateHistory(
-        order_id=db_order.id,
-        from_status=None,
-        to_status=models.OrderStatus.PENDING.value
+async def create_orders(db: AsyncSession, orders: List[schemas.OrderCreate]) -> List[int]:
+    """Insert a batch of orders with their items and history in the caller's transaction, and return
+    the new ids in input order. RETURNING makes SQLAlchemy send each table's rows as multi-row INSERTs
+    (up to 1000 rows per statement) instead of one statement per row."""
+    pending = models.OrderStatus.PENDING.value
+    result = await db.execute(
+        insert(models.Order).returning(models.Order.id, sort_by_parameter_order=True),
+        [{"user_id": order.user_id, "total_amount": order.total_amount, "status": pending} for order in orders],
     )
-    db.add(history)
+    order_ids = result.scalars().all()
+    items = [
+        {"order_id": order_id, "product_id": item.product_id, "quantity": item.quantity, "price": item.price}
+        for order_id, order in zip(order_ids, orders)
+        for item in order.items
+    ]
+    if items:
+        await db.execute(insert(models.OrderItem).returning(models.OrderItem.id), items)
+    await db.execute(
+        insert(models.OrderStateHistory).returning(models.OrderStateHistory.id),
+        [{"order_id": order_id, "from_status": None, "to_status": pending} for order_id in order_ids],
+    )
+    await record_changes(db, "orders", [
+        order_created(order_id, order.user_id, order.total_amount) for order_id, order in zip(order_ids, orders)
+    ])
+    return order_ids
+
+async def update_order_statuses(db: AsyncSession, order_ids: List[int], status: str) -> List[Tuple[int, str]]:
+    """Move many orders to one status with a single UPDATE and a single history INSERT.
+    Orders already in that status are left alone. Returns (order_id, previous status) for each order changed."""
+    # UPDATE ... RETURNING only sees the new row, so the old status comes from a locked snapshot joined in.
+    # One array parameter keeps it one prepared statement however many ids are sent.
+    previous = (
+        select(models.Order.id, models.Order.status)
+        .where(models.Order.id == any_(bindparam("order_ids", order_ids, type_=ARRAY(Integer))))
+        .where(models.Order.status.is_distinct_from(status))
+        .with_for_update()
+        .subquery()
+    )
+    result = await db.execute(
+        update(models.Order)
+        .where(models.Order.id == previous.c.id)
+        .values(status=status)
+        .returning(models.Order.id, previous.c.status, models.Order.user_id)
+        .execution_options(synchronize_session=False)
+    )
+    rows = result.all()
+    changed = [(order_id, from_status) for order_id, from_status, _ in rows]
+    if changed:
+        await db.execute(
+            insert(models.OrderStateHistory).returning(models.OrderStateHistory.id),
+            [{"order_id": order_id, "from_status": from_status, "to_status": status} for order_id, from_status in changed],
+        )
+        await record_changes(db, "orders", [
+            order_status_changed(order_id, user_id, from_status, status) for order_id, from_status, user_id in rows
+        ])
     await db.commit()
-    
-    # Eagerly load items relationship to prevent async serialization errors
+    return changed
+
+async def get_existing_order_ids(db: AsyncSession, order_ids: List[int]) -> List[int]:
     result = await db.execute(
-        select(models.Order)
-        .options(selectinload(models.Order.items))
-        .where(models.Order.id == db_order.id)
+        select(models.Order.id).where(models.Order.id == any_(bindparam("order_ids", order_ids, type_=ARRAY(Integer))))
     )
-    return result.scalars().first()
+    return result.scalars().all()
 
 async def update_order_status(db: AsyncSession, order_id: int, status: str):
     db_order = await get_order(db, order_id)
@@ -70,6 +181,8 @@ async def update_order_status(db: AsyncSession, order_id: int, status: str):
             to_status=status
         )
         db.add(history)
+        await db.flush()
+        await record_changes(db, "orders", [order_status_changed(db_order.id, db_order.user_id, old_status, status)])
         await db.commit()
         await db.refresh(db_order)
     return db_order
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Float, DateTime, ForeignKey, Enum
+from sqlalchemy import Column, Integer, String, Float, DateTime, ForeignKey, Enum, Index
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 import enum
@@ -18,7 +18,7 @@ class Order(Base):
     __tablename__ = "orders"
 
     id = Column(Integer, primary_key=True, index=True)
-    user_id = Column(Integer, index=True)
+    user_id = Column(Integer)  # indexed through ix_orders_user_id_created_at_id
     status = Column(String, default=OrderStatus.PENDING.value)
     total_amount = Column(Float, default=0.0)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
@@ -27,11 +27,18 @@ class Order(Base):
     items = relationship("OrderItem", back_populates="order")
     history = relationship("OrderStateHistory", back_populates="order")
 
+    # Keyset pagination of the newest-first listing, unfiltered and by each equality filter
+    __table_args__ = (
+        Index("ix_orders_created_at_id", "created_at", "id"),
+        Index("ix_orders_user_id_created_at_id", "user_id", "created_at", "id"),
+        Index("ix_orders_status_created_at_id", "status", "created_at", "id"),
+    )
+
 class OrderItem(Base):
     __tablename__ = "order_items"
 
     id = Column(Integer, primary_key=True, index=True)
-    order_id = Column(Integer, ForeignKey("orders.id"))
+    order_id = Column(Integer, ForeignKey("orders.id"), index=True)
     product_id = Column(Integer)
     quantity = Column(Integer)
     price = Column(Float)
@@ -42,7 +49,7 @@ class OrderStateHistory(Base):
     __tablename__ = "order_state_history"
 
     id = Column(Integer, primary_key=True, index=True)
-    order_id = Column(Integer, ForeignKey("orders.id"))
+    order_id = Column(Integer, ForeignKey("orders.id"), index=True)
     from_status = Column(String)
     to_status = Column(String)
     timestamp = Column(DateTime(timezone=True), server_default=func.now())
@@ -1,64 +1,184 @@
-from fastapi import APIRouter, Depends, HTTPException, WebSocket, WebSocketDisconnect
+import os
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, WebSocket, WebSocketDisconnect
+from pydantic import ValidationError
+from sqlalchemy.exc import SQLAlchemyError
 from sqlalchemy.ext.asyncio import AsyncSession
-from typing import List, Dict
-from backend.shared.database import get_db
+from datetime import datetime
+from typing import List, Dict, Optional
+from backend.shared.database import DB_REPLICA_MAX_LAG, engine, get_db, get_read_db
 from backend.shared import auth
+from backend.shared.change_feed import ChangeFeed
 
 from . import crud, schemas, models
+from .cache import order_cache
+from .connection_manager import manager
 
-# Simple connection manager for order status updates via WebSocket
-class ConnectionManager:
-    def __init__(self):
-        self.active_connections: Dict[int, List[WebSocket]] = {}
-
-    async def connect(self, websocket: WebSocket, order_id: int):
-        await websocket.accept()
-        if order_id not in self.active_connections:
-            self.active_connections[order_id] = []
-        self.active_connections[order_id].append(websocket)
-
-    def disconnect(self, websocket: WebSocket, order_id: int):
-        if order_id in self.active_connections:
-            self.active_connections[order_id].remove(websocket)
-            if not self.active_connections[order_id]:
-                del self.active_connections[order_id]
-
-    async def broadcast(self, message: str, order_id: int):
-        if order_id in self.active_connections:
-            for connection in self.active_connections[order_id]:
-                await connection.send_text(message)
-
-manager = ConnectionManager()
 router = APIRouter()
 
+# Creations and status changes, as Server-Sent Events
+feed = ChangeFeed("orders")
+
+MAX_PAGE_SIZE = 500
+
+# Pagination metadata travels in headers so the body stays the plain list existing clients expect
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+TOTAL_COUNT_HEADER = "X-Total-Count"
+
+ORDERS_BULK_MAX = int(os.getenv("ORDERS_BULK_MAX", 1000))  # orders per bulk request
+ORDERS_BULK_CHUNK_SIZE = int(os.getenv("ORDERS_BULK_CHUNK_SIZE", 200))  # orders per transaction
+
 # CREATE (no auth required for chatbot integration)
 @router.post("/", response_model=schemas.Order)
 async def create_order(
     order: schemas.OrderCreate,
+    response: Response,
     db: AsyncSession = Depends(get_db),
 ):
-    return await crud.create_order(db=db, order=order)
+    db_order = await crud.create_order(db=db, order=order)
+    # Write-through: whoever created the order usually polls it next
+    payload = schemas.Order.model_validate(db_order).model_dump_json().encode()
+    await order_cache.set(db_order.id, payload)
+    created = Response(content=payload, media_type="application/json")
+    # A returned Response replaces the injected one, so carry over what dependencies set on it,
+    # e.g. get_db's read-your-writes cookie
+    created.raw_headers.extend(response.raw_headers)
+    return created
+
+@router.post("/bulk", response_model=schemas.BulkOrderResponse)
+async def create_orders_bulk(
+    batch: schemas.BulkOrderCreate,
+    db: AsyncSession = Depends(get_db),
+    current_user: dict = Depends(auth.get_current_user),
+):
+    if len(batch.orders) > ORDERS_BULK_MAX:
+        raise HTTPException(status_code=413, detail=f"At most {ORDERS_BULK_MAX} orders per request")
+
+    results: Dict[int, schemas.BulkOrderResult] = {}
+    valid = []
+    for index, raw in enumerate(batch.orders):
+        try:
+            valid.append((index, schemas.OrderCreate.model_validate(raw)))
+        except ValidationError as e:
+            errors = e.errors(include_url=False, include_context=False, include_input=False)
+            results[index] = schemas.BulkOrderResult(index=index, status="invalid", errors=errors)
+
+    for start in range(0, len(valid), ORDERS_BULK_CHUNK_SIZE):
+        for result in await _create_chunk(db, valid[start:start + ORDERS_BULK_CHUNK_SIZE]):
+            results[result.index] = result
+
+    created = sum(1 for result in results.values() if result.status == "created")
+    return schemas.BulkOrderResponse(
+        created=created,
+        failed=len(results) - created,
+        results=[results[index] for index in sorted(results)],
+    )
+
+async def _create_chunk(db: AsyncSession, chunk: list) -> List[schemas.BulkOrderResult]:
+    try:
+        order_ids = await crud.create_orders(db, [order for _, order in chunk])
+        await db.commit()
+        return [
+            schemas.BulkOrderResult(index=index, status="created", order_id=order_id)
+            for (index, _), order_id in zip(chunk, order_ids)
+        ]
+    except SQLAlchemyError:
+        await db.rollback()
+    # Something in the chunk was rejected: redo it one order per transaction so only the culprits fail
+    results = []
+    for index, order in chunk:
+        try:
+            order_ids = await crud.create_orders(db, [order])
+            await db.commit()
+            results.append(schemas.BulkOrderResult(index=index, status="created", order_id=order_ids[0]))
+        except SQLAlchemyError as e:
+            await db.rollback()
+            results.append(schemas.BulkOrderResult(index=index, status="failed", errors=[str(getattr(e, "orig", e))]))
+    return results
 
 # READ (unauthenticated)
 @router.get("/", response_model=List[schemas.Order])
 async def read_orders(
-    skip: int = 0,
-    limit: int = 100,
-    db: AsyncSession = Depends(get_db),
+    response: Response,
+    skip: int = Query(0, ge=0, description="Offset paging, kept for existing clients; prefer cursor"),
+    limit: int = Query(100, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = Query(None, description=f"{NEXT_CURSOR_HEADER} from the previous page"),
+    user_id: Optional[int] = None,
+    status: Optional[models.OrderStatus] = None,
+    created_from: Optional[datetime] = Query(None, description="Inclusive"),
+    created_to: Optional[datetime] = Query(None, description="Exclusive"),
+    include_total: bool = Query(False, description=f"Count every matching order into {TOTAL_COUNT_HEADER}; costs a full scan of the matches"),
+    db: AsyncSession = Depends(get_read_db),
+):
+    try:
+        after = crud.decode_cursor(cursor) if cursor else None
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    filters = {
+        "user_id": user_id,
+        "status": status.value if status else None,
+        "created_from": created_from,
+        "created_to": created_to,
+    }
+    # One extra row tells us whether another page exists without a second query
+    orders = await crud.get_orders(db, skip=skip, limit=limit + 1, after=after, **filters)
+    if len(orders) > limit:
+        orders = orders[:limit]
+        response.headers[NEXT_CURSOR_HEADER] = crud.encode_cursor(orders[-1])
+    if include_total:
+        response.headers[TOTAL_COUNT_HEADER] = str(await crud.count_orders(db, **filters))
+    return orders
+
+# Declared before /{order_id}, which would otherwise claim the path with order_id="changes"
+@router.get("/changes")
+async def order_changes(
+    request: Request,
+    after: Optional[int] = Query(None, description="Event id to resume after, for clients that cannot send Last-Event-ID"),
+    user_id: Optional[int] = None,
+    status: Optional[models.OrderStatus] = None,
 ):
-    return await crud.get_orders(db, skip=skip, limit=limit)
+    """Stream order changes as they commit instead of re-polling the listing"""
+    return feed.response(request, after, user_id=user_id, status=status.value if status else None)
 
 @router.get("/{order_id}", response_model=schemas.Order)
 async def read_order(
     order_id: int,
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
 ):
-    db_order = await crud.get_order(db, order_id=order_id)
-    if db_order is None:
-        raise HTTPException(status_code=404, detail="Order not found")
-    return db_order
+    payload, lookup = await order_cache.get(order_id)
+    if payload is None:
+        db_order = await crud.get_order(db, order_id=order_id)
+        if db_order is None:
+            raise HTTPException(status_code=404, detail="Order not found")
+        payload = schemas.Order.model_validate(db_order).model_dump_json().encode()
+        # A replica may be behind the primary, so its copy is trusted no longer than replica reads are
+        await order_cache.set(order_id, payload, lookup, ttl=None if db.bind is engine else DB_REPLICA_MAX_LAG)
+    return Response(content=payload, media_type="application/json")
 
 # UPDATE
+# Declared before /{order_id}/status, which would otherwise claim the path with order_id="bulk"
+@router.put("/bulk/status", response_model=schemas.BulkStatusResult)
+async def update_order_statuses(
+    status_update: schemas.BulkStatusUpdate,
+    db: AsyncSession = Depends(get_db),
+    current_user: dict = Depends(auth.get_current_user),
+):
+    order_ids = list(dict.fromkeys(status_update.order_ids))
+    if len(order_ids) > ORDERS_BULK_MAX:
+        raise HTTPException(status_code=413, detail=f"At most {ORDERS_BULK_MAX} orders per request")
+    status = status_update.status.value
+    changed = await crud.update_order_statuses(db, order_ids=order_ids, status=status)
+    updated = [order_id for order_id, _ in changed]
+    updated_ids = set(updated)
+    rest = [order_id for order_id in order_ids if order_id not in updated_ids]
+    existing = set(await crud.get_existing_order_ids(db, rest)) if rest else set()
+    await order_cache.invalidate(updated)
+    await manager.broadcast_many({order_id: f"Order status updated to {status}" for order_id in updated})
+    return schemas.BulkStatusResult(
+        updated=updated,
+        unchanged=[order_id for order_id in rest if order_id in existing],
+        not_found=[order_id for order_id in rest if order_id not in existing],
+    )
+
 @router.put("/{order_id}/status", response_model=schemas.Order)
 async def update_order_status(
     order_id: int,
@@ -69,6 +189,7 @@ async def update_order_status(
     db_order = await crud.update_order_status(db, order_id=order_id, status=status_update.status.value)
     if db_order is None:
         raise HTTPException(status_code=404, detail="Order not found")
+    await order_cache.invalidate([order_id])
     await manager.broadcast(f"Order status updated to {status_update.status.value}", order_id)
     return db_order
 
@@ -1,5 +1,5 @@
-from pydantic import BaseModel
-from typing import List, Optional
+from pydantic import BaseModel, Field
+from typing import Any, Dict, List, Optional
 from datetime import datetime
 from .models import OrderStatus
 
@@ -20,8 +20,8 @@ class OrderItem(OrderItemBase):
 
 class OrderBase(BaseModel):
     user_id: int
-from pydantic import BaseModel
-from typing import List, Optional
+from pydantic import BaseModel, Field
+from typing import Any, Dict, List, Optional
 from datetime import datetime
 from .models import OrderStatus
 
@@ -48,7 +48,16 @@ class OrderCreate(OrderBase):
     items: List[OrderItemCreate]
 
 class OrderUpdate(BaseModel):
-    status: str
+    status: OrderStatus
+
+class BulkStatusUpdate(BaseModel):
+    order_ids: List[int] = Field(..., min_length=1)
+    status: OrderStatus
+
+class BulkStatusResult(BaseModel):
+    updated: List[int]
+    unchanged: List[int]  # already in the requested status; no history row is written for these
+    not_found: List[int]
 
 class Order(OrderBase):
     id: int
@@ -59,3 +68,18 @@ class Order(OrderBase):
 
     class Config:
         from_attributes = True
+
+class BulkOrderCreate(BaseModel):
+    # Each entry is validated as an OrderCreate on its own, so one bad order is reported rather than failing the batch
+    orders: List[Dict[str, Any]] = Field(..., min_length=1)
+
+class BulkOrderResult(BaseModel):
+    index: int  # position in the submitted list
+    status: str  # "created", "invalid" or "failed"
+    order_id: Optional[int] = None
+    errors: Optional[List[Any]] = None
+
+class BulkOrderResponse(BaseModel):
+    created: int
+    failed: int
+    results: List[BulkOrderResult]
@@ -1,5 +1,6 @@
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
+from backend.shared.change_feed import record_changes
 from . import models, schemas
 
 async def create_return(db: AsyncSession, return_req: schemas.ReturnCreate):
@@ -10,6 +11,11 @@ async def create_return(db: AsyncSession, return_req: schemas.ReturnCreate):
         status=models.ReturnStatus.REQUESTED.value
     )
     db.add(db_return)
+    await db.flush()
+    await record_changes(db, "returns", [{
+        "entity_id": db_return.id, "action": "created", "status": db_return.status,
+        "data": schemas.Return.model_validate(db_return).model_dump(mode="json"),
+    }])
     await db.commit()
     await db.refresh(db_return)
     return db_return
@@ -26,7 +32,13 @@ async def get_all_returns(db: AsyncSession, skip: int = 0, limit: int = 100):
 async def update_return_status(db: AsyncSession, return_id: int, status: str):
     db_return = await get_return(db, return_id)
     if db_return:
+        previous_status = db_return.status
         db_return.status = status
+        await db.flush()
+        await record_changes(db, "returns", [{
+            "entity_id": db_return.id, "action": "status_changed", "status": status,
+            "data": {"order_id": db_return.order_id, "previous_status": previous_status},
+        }])
         await db.commit()
         await db.refresh(db_return)
     return db_return
@@ -1,16 +1,32 @@
 from fastapi import FastAPI
-from backend.services.returns_service import routes, models
+from backend.services.returns_service import routes
 from backend.shared.database import engine
+from backend.shared.migrations import ensure_schema
 from contextlib import asynccontextmanager
+from backend.shared.metrics import instrument_app
+from backend.shared.deadline import DeadlineMiddleware
+from backend.shared.query_stats import QueryStatsMiddleware
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    async with engine.begin() as conn:
-        await conn.run_sync(models.Base.metadata.create_all)
+    # One version query when the schema is current; pending migrations are applied under a lock
+    await ensure_schema(engine)
+    # Polls the change log while anyone follows the SSE feed
+    await routes.feed.start()
     yield
+    await routes.feed.stop()
+    await engine.dispose()
 
 app = FastAPI(title="Returns Service", lifespan=lifespan)
 
+# Stop working on requests whose caller has already given up
+app.add_middleware(DeadlineMiddleware)
+
+# Per-statement latency, slow-query log and N+1 detection
+app.add_middleware(QueryStatsMiddleware, service="returns")
+
+instrument_app(app, "returns", engine)
+
 app.include_router(routes.router, prefix="/api/returns", tags=["returns"])
 
 @app.get("/health")
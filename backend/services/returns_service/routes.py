@@ -1,11 +1,16 @@
-from fastapi import APIRouter, Depends, HTTPException
+from typing import Optional
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
 from sqlalchemy.ext.asyncio import AsyncSession
-from backend.shared.database import get_db
+from backend.shared.database import get_db, get_read_db
 from backend.shared import auth
+from backend.shared.change_feed import ChangeFeed
 from . import crud, schemas, models
 
 router = APIRouter()
 
+# Return requests and their status changes, as Server-Sent Events
+feed = ChangeFeed("returns")
+
 @router.post("/", response_model=schemas.Return)
 async def create_return_request(
     return_req: schemas.ReturnCreate, 
@@ -18,16 +23,26 @@ async def create_return_request(
 async def read_all_returns(
     skip: int = 0,
     limit: int = 100,
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ):
     """Get all return requests (unauthenticated for frontend access)"""
     return await crud.get_all_returns(db, skip=skip, limit=limit)
 
 
+# Declared before /{return_id}, which would otherwise claim the path with return_id="changes"
+@router.get("/changes")
+async def return_changes(
+    request: Request,
+    after: Optional[int] = Query(None, description="Event id to resume after, for clients that cannot send Last-Event-ID"),
+    status: Optional[models.ReturnStatus] = None,
+):
+    """Stream return changes as they commit instead of re-polling the listing"""
+    return feed.response(request, after, status=status.value if status else None)
+
 @router.get("/{return_id}", response_model=schemas.Return)
 async def read_return(
     return_id: int, 
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
     current_user: dict = Depends(auth.get_current_user)
 ):
     db_return = await crud.get_return(db, return_id=return_id)
@@ -1,8 +1,15 @@
 from fastapi import FastAPI
 from backend.services.salesforce_service import routes
+from backend.shared.metrics import instrument_app
+from backend.shared.deadline import DeadlineMiddleware
 
 app = FastAPI(title="Salesforce Service")
 
+# Stop working on requests whose caller has already given up
+app.add_middleware(DeadlineMiddleware)
+
+instrument_app(app, "salesforce")
+
 app.include_router(routes.router, prefix="/api/salesforce", tags=["salesforce"])
 
 @app.get("/health")
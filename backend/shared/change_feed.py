@@ -0,0 +1,279 @@
+import os
+import json
+import asyncio
+import time
+from typing import AsyncIterator, Dict, List, Optional, Set
+from fastapi import HTTPException, Request
+from fastapi.responses import StreamingResponse
+from sqlalchemy import BigInteger, Column, DateTime, Index, Integer, String, delete, func, select, text
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.ext.asyncio import AsyncSession
+from dotenv import load_dotenv
+from backend.shared.database import Base, engine
+from backend.shared.logger import get_logger
+from backend.shared.metrics import CHANGE_FEED_OVERFLOWS, CHANGE_FEED_STREAMS
+
+load_dotenv()
+logger = get_logger(__name__)
+
+CHANGE_FEED_POLL_INTERVAL = float(os.getenv("CHANGE_FEED_POLL_INTERVAL", 0.5))  # seconds between checks for new events, per feed and process
+CHANGE_FEED_HEARTBEAT = float(os.getenv("CHANGE_FEED_HEARTBEAT", 15.0))  # seconds of silence before a heartbeat comment is sent
+CHANGE_FEED_RETENTION = float(os.getenv("CHANGE_FEED_RETENTION", 24.0))  # hours of events kept for clients resuming with Last-Event-ID
+CHANGE_FEED_CLIENT_QUEUE = int(os.getenv("CHANGE_FEED_CLIENT_QUEUE", 64))  # batches buffered per stream before it counts as too slow
+CHANGE_FEED_RETRY_MS = int(os.getenv("CHANGE_FEED_RETRY_MS", 3000))  # reconnect delay suggested to EventSource clients
+
+CHANGE_FEED_BATCH = 500  # events read per query
+CHANGE_FEED_PRUNE_INTERVAL = 300.0  # seconds between deletions of expired events, per process
+# Arbitrary constant; the second lock key is the feed name, so writers of different feeds never wait on each other
+CHANGE_FEED_LOCK_ID = 72_311_025
+
+class ChangeEvent(Base):
+    __tablename__ = "change_events"
+
+    id = Column(BigInteger, primary_key=True)
+    entity = Column(String, nullable=False)  # the feed: orders, inventory or returns
+    entity_id = Column(Integer, nullable=False)
+    action = Column(String, nullable=False)
+    # Denormalized so streams can be filtered without reading the entity back
+    user_id = Column(Integer, nullable=True)
+    status = Column(String, nullable=True)
+    data = Column(JSONB, nullable=True)
+    created_at = Column(DateTime(timezone=True), nullable=False, server_default=func.now())
+
+    __table_args__ = (
+        Index("ix_change_events_entity_id", "entity", "id"),
+        Index("ix_change_events_created_at", "created_at"),
+    )
+
+# One round trip however many changes: the lock is taken before the first row draws its id
+RECORD_CHANGES = text("""
+    WITH feed_lock AS MATERIALIZED (SELECT pg_advisory_xact_lock(:lock_id, hashtext(:entity)))
+    INSERT INTO change_events (entity, entity_id, action, user_id, status, data)
+    SELECT :entity, c.entity_id, c.action, c.user_id, c.status, c.data
+    FROM feed_lock, ROWS FROM (
+        jsonb_to_recordset(CAST(:changes AS jsonb)) AS (entity_id integer, action text, user_id integer, status text, data jsonb)
+    ) WITH ORDINALITY AS c (entity_id, action, user_id, status, data, position)
+    ORDER BY c.position
+""")
+
+async def record_changes(db: AsyncSession, entity: str, changes: List[dict]):
+    """Append events to the `entity` feed in the caller's transaction, so they commit or roll back with
+    the change itself. Each change is a dict of entity_id, action and optionally user_id, status and data.
+
+    Make this the last statement before commit: the lock it takes, held until then, makes a feed's
+    event ids commit in increasing order, so a reader that has seen id N can never later find N - 1.
+    """
+    if not changes:
+        return
+    await db.execute(RECORD_CHANGES, {
+        "lock_id": CHANGE_FEED_LOCK_ID,
+        "entity": entity,
+        "changes": json.dumps([{"user_id": None, "status": None, "data": None, **change} for change in changes], default=str),
+    })
+
+class Event:
+    """One change, serialized once into its SSE frame however many streams it is sent to"""
+
+    __slots__ = ("id", "user_id", "status", "frame")
+
+    def __init__(self, row):
+        self.id = row.id
+        self.user_id = row.user_id
+        self.status = row.status
+        payload = {
+            "entity": row.entity,
+            "id": row.entity_id,
+            "action": row.action,
+            "user_id": row.user_id,
+            "status": row.status,
+            "data": row.data,
+            "at": row.created_at.isoformat(),
+        }
+        self.frame = f"id: {row.id}\ndata: {json.dumps(payload, default=str)}\n\n".encode()
+
+    def matches(self, filters: Dict[str, object]) -> bool:
+        return all(getattr(self, name) == value for name, value in filters.items())
+
+class Stream:
+    """One connected client: the events the poller hands over wait here until the client takes them"""
+
+    def __init__(self, filters: Dict[str, object], position: int):
+        self.filters = filters
+        self.position = position  # newest event id at subscription; live delivery starts after it
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=CHANGE_FEED_CLIENT_QUEUE)
+        self.overflowed = False
+
+class ChangeFeed:
+    """Server-Sent Events for one entity. However many clients are connected, each process runs a
+    single query per poll interval and fans the result out in memory; clients that reconnect with
+    Last-Event-ID first catch up from the table, so nothing committed in between is missed."""
+
+    def __init__(self, entity: str):
+        self.entity = entity
+        self.streams: Set[Stream] = set()
+        self.head = 0  # newest event id read by the poller
+        self.task: Optional[asyncio.Task] = None
+        self.wakeup: Optional[asyncio.Event] = None
+
+    async def start(self):
+        self.wakeup = asyncio.Event()
+        self.task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self.task is not None:
+            self.task.cancel()
+            try:
+                await self.task
+            except asyncio.CancelledError:
+                pass
+            self.task = None
+
+    def response(self, request: Request, after: Optional[int] = None, **filters) -> StreamingResponse:
+        """`after` is the query-string fallback for the Last-Event-ID header; filters set to None are ignored"""
+        header = request.headers.get("last-event-id")
+        if header:
+            try:
+                after = int(header)
+            except ValueError:
+                raise HTTPException(status_code=400, detail=f"Invalid Last-Event-ID: {header}")
+        filters = {name: value for name, value in filters.items() if value is not None}
+        return StreamingResponse(
+            self._frames(filters, after),
+            media_type="text/event-stream",
+            headers={
+                # no-transform also keeps the compression middleware from holding back small frames
+                "Cache-Control": "no-cache, no-transform",
+                "X-Accel-Buffering": "no",
+            },
+        )
+
+    async def _frames(self, filters: Dict[str, object], after: Optional[int]) -> AsyncIterator[bytes]:
+        stream = await self._subscribe(filters)
+        try:
+            yield f"retry: {CHANGE_FEED_RETRY_MS}\n\n".encode()
+            sent = stream.position
+            if after is not None:
+                if await self._expired(after):
+                    # Events the client missed are gone: it has to re-read the collection, then follow on from here
+                    yield f"id: {stream.position}\nevent: reset\ndata: {{}}\n\n".encode()
+                else:
+                    sent = after
+                    while True:
+                        events = await self._read(sent, filters)
+                        for event in events:
+                            yield event.frame
+                        if events:
+                            sent = events[-1].id
+                        if len(events) < CHANGE_FEED_BATCH:
+                            break
+
+            while True:
+                try:
+                    batch = await asyncio.wait_for(stream.queue.get(), timeout=CHANGE_FEED_HEARTBEAT)
+                except asyncio.TimeoutError:
+                    if stream.overflowed:
+                        return
+                    yield b": heartbeat\n\n"
+                    continue
+                for event in batch:
+                    if event.id > sent:  # already sent while catching up
+                        yield event.frame
+                        sent = event.id
+                if stream.overflowed and stream.queue.empty():
+                    # Ending the response makes the client reconnect with Last-Event-ID and catch up from the table
+                    return
+        finally:
+            self._unsubscribe(stream)
+
+    async def _subscribe(self, filters: Dict[str, object]) -> Stream:
+        if not self.streams:
+            # The poller idles with nobody listening, so its position may be old
+            self.head = max(self.head, await self._latest_id())
+        stream = Stream(filters, self.head)
+        self.streams.add(stream)
+        CHANGE_FEED_STREAMS.labels(self.entity).inc()
+        if self.wakeup is not None:
+            self.wakeup.set()
+        return stream
+
+    def _unsubscribe(self, stream: Stream):
+        if stream in self.streams:
+            self.streams.discard(stream)
+            CHANGE_FEED_STREAMS.labels(self.entity).dec()
+
+    async def _run(self):
+        last_prune = 0.0
+        while True:
+            try:
+                if self.streams:
+                    events = await self._read(self.head)
+                    if events:
+                        self.head = max(self.head, events[-1].id)
+                        self._deliver(events)
+                        if len(events) == CHANGE_FEED_BATCH:
+                            continue  # More waiting: read on without sleeping
+                if time.monotonic() - last_prune >= CHANGE_FEED_PRUNE_INTERVAL:
+                    last_prune = time.monotonic()
+                    await self._prune()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Change feed {self.entity} poll failed: {str(e)}")
+            await self._sleep()
+
+    async def _sleep(self):
+        if self.streams:
+            await asyncio.sleep(CHANGE_FEED_POLL_INTERVAL)
+            return
+        # Nobody listening: wake for the next subscriber, or for the next prune
+        self.wakeup.clear()
+        try:
+            await asyncio.wait_for(self.wakeup.wait(), timeout=CHANGE_FEED_PRUNE_INTERVAL)
+        except asyncio.TimeoutError:
+            pass
+
+    def _deliver(self, events: List[Event]):
+        for stream in list(self.streams):
+            matched = [event for event in events if event.id > stream.position and event.matches(stream.filters)]
+            if not matched:
+                continue
+            try:
+                stream.queue.put_nowait(matched)
+            except asyncio.QueueFull:
+                logger.warning(f"Closing slow {self.entity} change stream; it will resume from its Last-Event-ID")
+                CHANGE_FEED_OVERFLOWS.labels(self.entity).inc()
+                stream.overflowed = True
+                self._unsubscribe(stream)
+
+    async def _read(self, after: int, filters: Optional[Dict[str, object]] = None) -> List[Event]:
+        query = select(ChangeEvent).where(ChangeEvent.entity == self.entity, ChangeEvent.id > after)
+        for name, value in (filters or {}).items():
+            query = query.where(getattr(ChangeEvent, name) == value)
+        async with engine.connect() as conn:
+            rows = (await conn.execute(query.order_by(ChangeEvent.id).limit(CHANGE_FEED_BATCH))).all()
+        return [Event(row) for row in rows]
+
+    async def _latest_id(self) -> int:
+        async with engine.connect() as conn:
+            return (await conn.execute(select(func.max(ChangeEvent.id)).where(ChangeEvent.entity == self.entity))).scalar() or 0
+
+    async def _expired(self, after: int) -> bool:
+        """True when events after `after` may have been pruned, or the id was never issued here at all"""
+        async with engine.connect() as conn:
+            oldest, newest = (await conn.execute(text(
+                "SELECT (SELECT min(id) FROM change_events), "
+                "(SELECT CASE WHEN is_called THEN last_value ELSE 0 END FROM change_events_id_seq)"
+            ))).one()
+        if after > newest:
+            return True
+        if oldest is None:
+            return after < newest
+        return after < oldest - 1
+
+    async def _prune(self):
+        async with engine.begin() as conn:
+            result = await conn.execute(
+                delete(ChangeEvent).where(ChangeEvent.created_at < func.now() - func.make_interval(0, 0, 0, 0, 0, 0, CHANGE_FEED_RETENTION * 3600))
+            )
+        if result.rowcount:
+            logger.info(f"Pruned {result.rowcount} change events older than {CHANGE_FEED_RETENTION}h")
@@ -1,10 +1,24 @@
+from fastapi import Request, Response
+from sqlalchemy import event, text
+from sqlalchemy.engine import Engine
 from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
-from sqlalchemy.orm import sessionmaker, declarative_base
-from sqlalchemy.pool import NullPool
+from sqlalchemy.orm import Session, sessionmaker, declarative_base
+from sqlalchemy.pool import AsyncAdaptedQueuePool, NullPool
 import os
+import math
+import logging
+import time
+import itertools
+from uuid import uuid4
+from typing import Callable, Dict, List, Optional
 from dotenv import load_dotenv
+from backend.shared.deadline import remaining
+from backend.shared.metrics import DB_READ_ROUTING, DB_REPLICA_LAG
 
 load_dotenv()
+# Plain logger: SQLAlchemy names pool loggers after the pool class's module, so a DEBUG-level
+# service logger here would turn on per-checkout debug logging for TimedQueuePool
+logger = logging.getLogger(__name__)
 
 POSTGRES_USER = os.getenv("POSTGRES_USER", "user")
 POSTGRES_PASSWORD = os.getenv("POSTGRES_PASSWORD", "password")
@@ -14,11 +28,85 @@ POSTGRES_PORT = os.getenv("POSTGRES_PORT", "5432")
 
 DATABASE_URL = f"postgresql+asyncpg://{POSTGRES_USER}:{POSTGRES_PASSWORD}@{POSTGRES_HOST}:{POSTGRES_PORT}/{POSTGRES_DB}"
 
-engine = create_async_engine(
-    DATABASE_URL,
-    echo=False,
-    poolclass=NullPool  # For serverless/microservices to avoid holding connections
-)
+# Streaming replicas for read-only endpoints, e.g. POSTGRES_REPLICAS="replica-1:5432,replica-2"
+POSTGRES_REPLICAS = [host.strip() for host in os.getenv("POSTGRES_REPLICAS", "").split(",") if host.strip()]
+DB_REPLICA_MAX_LAG = float(os.getenv("DB_REPLICA_MAX_LAG", 5.0))  # seconds behind the primary a replica may be
+DB_REPLICA_LAG_CHECK_INTERVAL = float(os.getenv("DB_REPLICA_LAG_CHECK_INTERVAL", 1.0))
+# How long a client's reads stay on the primary after it writes, so it always sees its own changes
+DB_READ_YOUR_WRITES_WINDOW = float(os.getenv("DB_READ_YOUR_WRITES_WINDOW", DB_REPLICA_MAX_LAG))
+LAST_WRITE_COOKIE = "db_last_write"
+
+# "internal": keep a pool of open connections in each process (the default).
+# "external": a transaction-mode pooler such as PgBouncer sits in front of Postgres and does the pooling,
+#             so connect per session and avoid server-side prepared statements that outlive a transaction.
+# "none":     open a fresh connection for every session.
+DB_POOL_MODE = os.getenv("DB_POOL_MODE", "internal")
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", 5))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", 10))
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", 30.0))  # seconds to wait for a free connection
+DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", 1800))  # replace connections older than this, in seconds
+DB_POOL_PRE_PING = os.getenv("DB_POOL_PRE_PING", "true").lower() == "true"
+DB_STATEMENT_CACHE_SIZE = int(os.getenv("DB_STATEMENT_CACHE_SIZE", 100))  # asyncpg prepared statements per connection
+
+class TimedQueuePool(AsyncAdaptedQueuePool):
+    """Queue pool that reports how long each checkout waited for a connection"""
+
+    # Class-level so the observers survive engine.dispose(), which builds a fresh pool instance
+    checkout_wait_observers: List[Callable[[float], None]] = []
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            elapsed = time.perf_counter() - start
+            for observe in self.checkout_wait_observers:
+                observe(elapsed)
+
+# Each engine's server-side statement_timeout in ms, 0 for none; read once, when it first connects
+server_statement_timeouts: Dict[Engine, int] = {}
+
+def make_engine(url: str):
+    engine = _create_engine(url)
+
+    @event.listens_for(engine.sync_engine, "first_connect")
+    def read_statement_timeout(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        try:
+            cursor.execute("SELECT setting::int FROM pg_settings WHERE name = 'statement_timeout'")
+            server_statement_timeouts[engine.sync_engine] = cursor.fetchone()[0]
+        finally:
+            cursor.close()
+
+    return engine
+
+def _create_engine(url: str):
+    if DB_POOL_MODE == "external":
+        return create_async_engine(
+            url,
+            echo=False,
+            poolclass=NullPool,
+            connect_args={
+                "statement_cache_size": 0,
+                # Unique names, since consecutive transactions may land on different server connections
+                "prepared_statement_name_func": lambda: f"__asyncpg_{uuid4()}__",
+            },
+        )
+    if DB_POOL_MODE == "none":
+        return create_async_engine(url, echo=False, poolclass=NullPool)
+    return create_async_engine(
+        url,
+        echo=False,
+        poolclass=TimedQueuePool,
+        pool_size=DB_POOL_SIZE,
+        max_overflow=DB_MAX_OVERFLOW,
+        pool_timeout=DB_POOL_TIMEOUT,
+        pool_recycle=DB_POOL_RECYCLE,
+        pool_pre_ping=DB_POOL_PRE_PING,
+        connect_args={"statement_cache_size": DB_STATEMENT_CACHE_SIZE},
+    )
+
+engine = make_engine(DATABASE_URL)
 
 AsyncSessionLocal = sessionmaker(
     engine, class_=AsyncSession, expire_on_commit=False
@@ -26,7 +114,106 @@ AsyncSessionLocal = sessionmaker(
 
 Base = declarative_base()
 
-async def get_db():
+@event.listens_for(Session, "after_begin")
+def apply_request_deadline(session, transaction, connection):
+    # Postgres cancels any statement still running when the caller's deadline passes.
+    # SET LOCAL lasts until the transaction ends, so the next request on the connection is unaffected.
+    if connection.dialect.driver != "asyncpg":
+        return  # not one of the service engines, e.g. seed_database.py's
+    budget = remaining()
+    if budget is None:
+        return
+    timeout_ms = max(1, int(budget * 1000))
+    server_timeout_ms = server_statement_timeouts.get(connection.engine, 0)
+    if 0 < server_timeout_ms <= timeout_ms:
+        return  # the server's own limit is already tighter: skip the extra round trip
+    connection.exec_driver_sql(f"SET LOCAL statement_timeout = {timeout_ms}")
+
+# Zero while the replica has replayed everything it received; otherwise the age of the last replayed transaction
+REPLICATION_LAG_SQL = """
+SELECT CASE
+    WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+    ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0)
+END
+"""
+
+class Replica:
+    def __init__(self, host: str):
+        hostname, _, port = host.partition(":")
+        self.host = host
+        self.engine = make_engine(
+            f"postgresql+asyncpg://{POSTGRES_USER}:{POSTGRES_PASSWORD}@{hostname}:{port or POSTGRES_PORT}/{POSTGRES_DB}"
+        )
+        self.sessionmaker = sessionmaker(self.engine, class_=AsyncSession, expire_on_commit=False)
+        self.lag: Optional[float] = None  # None until measured, or after a failed check
+        self.checked_at = float("-inf")
+
+    async def current_lag(self, session: AsyncSession) -> Optional[float]:
+        # Measured at most once per interval, on the session about to serve the read
+        if time.monotonic() - self.checked_at >= DB_REPLICA_LAG_CHECK_INTERVAL:
+            self.checked_at = time.monotonic()
+            try:
+                self.lag = float((await session.execute(text(REPLICATION_LAG_SQL))).scalar() or 0)
+            except Exception as e:
+                logger.warning(f"Replica {self.host} lag check failed, reading from the primary: {str(e)}")
+                self.lag = None
+                await session.rollback()
+        return self.lag
+
+replicas = [Replica(host) for host in POSTGRES_REPLICAS]
+for _replica in replicas:
+    DB_REPLICA_LAG.labels(_replica.host).set_function(lambda replica=_replica: replica.lag if replica.lag is not None else float("nan"))
+_replica_turn = itertools.count()
+
+@event.listens_for(Session, "after_commit")
+def mark_client_write(session):
+    # Tell the client when it last wrote, so its next reads skip replicas that may not have the change yet
+    response = session.info.get("response")
+    if response is not None:
+        response.set_cookie(
+            LAST_WRITE_COOKIE,
+            str(int(time.time() * 1000)),
+            max_age=math.ceil(DB_READ_YOUR_WRITES_WINDOW),
+            httponly=True,
+            samesite="lax",
+        )
+
+def wrote_recently(request: Request) -> bool:
+    try:
+        return time.time() - int(request.cookies[LAST_WRITE_COOKIE]) / 1000 < DB_READ_YOUR_WRITES_WINDOW
+    except (KeyError, ValueError):
+        return False
+
+async def get_db(response: Response):
+    async with AsyncSessionLocal() as session:
+        if replicas:
+            session.info["response"] = response
+        try:
+            yield session
+        finally:
+            await session.close()
+
+async def get_read_db(request: Request):
+    """Session for read-only endpoints: a replica that is caught up, else the primary"""
+    if replicas and wrote_recently(request):
+        DB_READ_ROUTING.labels("primary_sticky").inc()
+    elif replicas:
+        first = next(_replica_turn)
+        for offset in range(len(replicas)):
+            replica = replicas[(first + offset) % len(replicas)]
+            session = replica.sessionmaker()
+            lag = await replica.current_lag(session)
+            if lag is None or lag > DB_REPLICA_MAX_LAG:
+                await session.close()
+                continue
+            DB_READ_ROUTING.labels("replica").inc()
+            try:
+                yield session
+            finally:
+                await session.close()
+            return
+        DB_READ_ROUTING.labels("primary_fallback").inc()
+
     async with AsyncSessionLocal() as session:
         try:
             yield session
@@ -0,0 +1,134 @@
+import time
+import asyncio
+from contextvars import ContextVar
+from typing import Dict, Iterable, Optional
+import httpx
+from starlette.datastructures import Headers
+from starlette.responses import PlainTextResponse
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from backend.shared.logger import get_logger
+
+logger = get_logger(__name__)
+
+# Milliseconds the caller is still willing to wait, measured when the request was sent.
+# A relative budget rather than a timestamp, so hops never have to agree on the wall clock.
+DEADLINE_HEADER = "x-request-timeout-ms"
+
+_deadline: ContextVar[Optional[float]] = ContextVar("request_deadline", default=None)  # time.monotonic()
+
+def remaining() -> Optional[float]:
+    """Seconds left before the current request's deadline, or None when it has none"""
+    deadline = _deadline.get()
+    if deadline is None:
+        return None
+    return deadline - time.monotonic()
+
+def bounded_timeout(timeout: float) -> float:
+    budget = remaining()
+    if budget is None:
+        return timeout
+    return max(0.001, min(timeout, budget))
+
+def _parse_budget(headers: Headers) -> Optional[float]:
+    value = headers.get(DEADLINE_HEADER)
+    if value is None:
+        return None
+    try:
+        return int(value) / 1000
+    except ValueError:
+        return None
+
+async def propagate_deadline(request: httpx.Request):
+    """httpx request hook: pass the remaining budget on and never wait on the upstream past it"""
+    budget = remaining()
+    if budget is None:
+        return
+    request.headers[DEADLINE_HEADER] = str(max(0, int(budget * 1000)))
+    timeouts = request.extensions.get("timeout")
+    if timeouts:
+        request.extensions["timeout"] = {
+            name: bounded_timeout(value) if value is not None else max(0.001, budget)
+            for name, value in timeouts.items()
+        }
+
+class DeadlineMiddleware:
+    """Honours the caller's deadline header: rejects requests that arrive already expired and
+    cancels the handler, DB statements included, if the budget runs out before it responds.
+
+    The deadline covers the wait for the response headers only; once they are sent the body may
+    take as long as it needs, so large downloads and streams are never cut off after a 200.
+
+    default_budget and budgets (path prefix -> seconds) cap every request, header or not; the
+    gateway uses them to start the deadline that the services downstream inherit. Paths in exempt,
+    such as Server-Sent Events routes, get no deadline at all.
+    """
+
+    def __init__(self, app: ASGIApp, default_budget: Optional[float] = None, budgets: Optional[Dict[str, float]] = None,
+                 exempt: Iterable[str] = ()):
+        self.app = app
+        self.default_budget = default_budget
+        self.budgets = budgets or {}
+        self.exempt = frozenset(exempt)
+
+    def budget_for(self, scope: Scope) -> Optional[float]:
+        limit = self.default_budget
+        for prefix, seconds in self.budgets.items():
+            if scope["path"].startswith(prefix):
+                limit = seconds
+                break
+        requested = _parse_budget(Headers(scope=scope))
+        if requested is None:
+            return limit
+        return requested if limit is None else min(requested, limit)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http" or scope["path"] in self.exempt:
+            await self.app(scope, receive, send)
+            return
+
+        budget = self.budget_for(scope)
+        if budget is None:
+            await self.app(scope, receive, send)
+            return
+        if budget <= 0:
+            # The caller has already given up; don't start work nobody will read
+            await PlainTextResponse("Deadline exceeded", status_code=504)(scope, receive, send)
+            return
+
+        response_started = asyncio.Event()
+
+        async def send_wrapper(message: Message):
+            if message["type"] == "http.response.start" and not response_started.is_set():
+                # Past this point a 504 can no longer be sent, so the rest of the response is unbounded
+                _deadline.set(None)
+                response_started.set()
+            await send(message)
+
+        # The handler runs in its own task, which inherits the deadline from the context it is created in
+        token = _deadline.set(time.monotonic() + budget)
+        try:
+            handler = asyncio.create_task(self.app(scope, receive, send_wrapper))
+        finally:
+            _deadline.reset(token)
+
+        try:
+            started = asyncio.create_task(response_started.wait())
+            try:
+                await asyncio.wait({handler, started}, timeout=budget, return_when=asyncio.FIRST_COMPLETED)
+            finally:
+                started.cancel()
+            if not handler.done() and not response_started.is_set():
+                handler.cancel()
+                try:
+                    await handler
+                except asyncio.CancelledError:
+                    pass
+                logger.warning(f"{scope['method']} {scope['path']} cancelled after its {budget:.3f}s deadline")
+                if not response_started.is_set():
+                    await PlainTextResponse("Deadline exceeded", status_code=504)(scope, receive, send)
+                return
+            await handler
+        finally:
+            # Only left running when this request was itself cancelled, e.g. by a client disconnect
+            if not handler.done():
+                handler.cancel()
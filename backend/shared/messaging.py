@@ -1,6 +1,8 @@
 import aio_pika
+import asyncio
 import json
 import os
+from typing import Awaitable, Callable, Dict, Optional
 from dotenv import load_dotenv
 from .logger import get_logger
 
@@ -43,3 +45,57 @@ async def consume_messages(queue_name: str, callback):
                     await callback(json.loads(message.body.decode()))
     except Exception as e:
         logger.error(f"Failed to consume messages: {str(e)}")
+
+_connection: Optional[aio_pika.abc.AbstractRobustConnection] = None
+_channel: Optional[aio_pika.abc.AbstractRobustChannel] = None
+_exchanges: Dict[str, aio_pika.abc.AbstractExchange] = {}
+_connect_lock = asyncio.Lock()
+
+async def get_channel() -> aio_pika.abc.AbstractRobustChannel:
+    """Shared channel on one robust connection, opened on first use and restored by aio_pika after outages"""
+    global _connection, _channel
+    async with _connect_lock:
+        if _connection is None:
+            _connection = await aio_pika.connect_robust(RABBITMQ_URL)
+        if _channel is None:
+            _channel = await _connection.channel()
+    return _channel
+
+async def _fanout_exchange(exchange_name: str) -> aio_pika.abc.AbstractExchange:
+    if exchange_name not in _exchanges:
+        channel = await get_channel()
+        _exchanges[exchange_name] = await channel.declare_exchange(exchange_name, aio_pika.ExchangeType.FANOUT)
+    return _exchanges[exchange_name]
+
+async def broadcast_event(exchange_name: str, message: dict) -> bool:
+    """Send a transient event to every process subscribed to exchange_name; False if it could not be sent"""
+    try:
+        exchange = await _fanout_exchange(exchange_name)
+        await exchange.publish(aio_pika.Message(body=json.dumps(message).encode()), routing_key="")
+        return True
+    except Exception as e:
+        logger.error(f"Failed to broadcast event on {exchange_name}: {str(e)}")
+        return False
+
+async def subscribe_events(exchange_name: str, callback: Callable[[dict], Awaitable[None]]):
+    """Deliver every event broadcast on exchange_name to callback. The queue is private to this process
+    and deleted with its connection, so events published while a process is down are never replayed to it."""
+    exchange = await _fanout_exchange(exchange_name)
+    queue = await (await get_channel()).declare_queue(exclusive=True, auto_delete=True)
+    await queue.bind(exchange)
+
+    async def on_message(message: aio_pika.abc.AbstractIncomingMessage):
+        try:
+            await callback(json.loads(message.body.decode()))
+        except Exception as e:
+            logger.error(f"Failed to handle event from {exchange_name}: {str(e)}")
+
+    await queue.consume(on_message, no_ack=True)
+
+async def close_messaging():
+    global _connection, _channel
+    if _connection is not None:
+        await _connection.close()
+    _connection = None
+    _channel = None
+    _exchanges.clear()
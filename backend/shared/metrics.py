@@ -0,0 +1,198 @@
+import time
+import httpx
+from fastapi import FastAPI, Response
+from prometheus_client import Counter, Gauge, Histogram, CONTENT_TYPE_LATEST, generate_latest
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+REQUEST_COUNT = Counter(
+    "http_requests_total",
+    "HTTP requests handled, by route template and status",
+    ["service", "method", "route", "status"],
+)
+REQUEST_LATENCY = Histogram(
+    "http_request_duration_seconds",
+    "Time from request start until the last response byte is sent",
+    ["service", "method", "route"],
+    buckets=LATENCY_BUCKETS,
+)
+REQUESTS_IN_PROGRESS = Gauge(
+    "http_requests_in_progress",
+    "HTTP requests currently being handled",
+    ["service", "method"],
+)
+UPSTREAM_LATENCY = Histogram(
+    "upstream_request_duration_seconds",
+    "Outgoing calls to other services, until response headers arrive",
+    ["service", "upstream", "method", "status"],
+    buckets=LATENCY_BUCKETS,
+)
+WEBSOCKET_CONNECTIONS = Gauge(
+    "websocket_connections_active",
+    "Open WebSocket connections",
+    ["service"],
+)
+WEBSOCKET_MESSAGES = Counter(
+    "websocket_messages_total",
+    "WebSocket messages relayed, by direction",
+    ["service", "direction"],
+)
+WEBSOCKET_EVICTIONS = Counter(
+    "websocket_evictions_total",
+    "WebSocket subscribers dropped for falling behind: queue_full or send_timeout",
+    ["service", "reason"],
+)
+HEDGED_REQUESTS = Counter(
+    "gateway_hedged_requests_total",
+    "Hedged upstream requests, by which copy answered first",
+    ["upstream", "winner"],
+)
+DB_POOL_CONNECTIONS = Gauge(
+    "db_pool_connections",
+    "SQLAlchemy connection pool state",
+    ["service", "state"],
+)
+
+DB_POOL_CHECKOUT_WAIT = Histogram(
+    "db_pool_checkout_wait_seconds",
+    "Time spent waiting for a pooled database connection, including connecting when the pool grows",
+    ["service"],
+    buckets=(0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0),
+)
+
+DB_READ_ROUTING = Counter(
+    "db_read_routing_total",
+    "Read-only sessions by where they were served: replica, primary_sticky (client wrote recently) or primary_fallback",
+    ["target"],
+)
+
+DB_REPLICA_LAG = Gauge(
+    "db_replica_lag_seconds",
+    "Replication lag last measured on each read replica (NaN when the check failed)",
+    ["replica"],
+)
+
+DB_QUERY_LATENCY = Histogram(
+    "db_query_duration_seconds",
+    "Time each SQL statement took, by the route that ran it",
+    ["service", "route", "operation"],
+    buckets=(0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0),
+)
+
+DB_QUERY_ROWS = Histogram(
+    "db_query_rows",
+    "Rows returned or affected per SQL statement",
+    ["service", "route", "operation"],
+    buckets=(0, 1, 5, 10, 50, 100, 500, 1000, 5000, 10000),
+)
+
+DB_QUERIES_PER_REQUEST = Histogram(
+    "db_queries_per_request",
+    "SQL statements run while handling one request",
+    ["service", "route"],
+    buckets=(1, 2, 3, 5, 10, 20, 50, 100, 200, 500),
+)
+
+DB_SLOW_QUERIES = Counter(
+    "db_slow_queries_total",
+    "SQL statements slower than DB_SLOW_QUERY_MS",
+    ["service", "route"],
+)
+
+DB_N_PLUS_ONE = Counter(
+    "db_n_plus_one_total",
+    "Statements one request ran at least DB_N_PLUS_ONE_THRESHOLD times over",
+    ["service", "route"],
+)
+
+ORDER_CACHE_REQUESTS = Counter(
+    "order_cache_requests_total",
+    "Order lookups by result: memory_hit, redis_hit or miss",
+    ["result"],
+)
+
+CHANGE_FEED_STREAMS = Gauge(
+    "change_feed_streams_active",
+    "Open Server-Sent Events change streams",
+    ["feed"],
+)
+
+CHANGE_FEED_OVERFLOWS = Counter(
+    "change_feed_overflows_total",
+    "Change streams closed for falling behind; their clients resume from Last-Event-ID",
+    ["feed"],
+)
+
+class MetricsMiddleware:
+    """Records count, latency and in-flight requests per route template (never per raw path)"""
+
+    def __init__(self, app: ASGIApp, service: str):
+        self.app = app
+        self.service = service
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http" or scope["path"] == "/metrics":
+            await self.app(scope, receive, send)
+            return
+
+        method = scope["method"]
+        status_code = 500
+        start = time.perf_counter()
+
+        async def send_wrapper(message: Message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        in_progress = REQUESTS_IN_PROGRESS.labels(self.service, method)
+        in_progress.inc()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            in_progress.dec()
+            # The router stores the matched route in the scope; unmatched paths share one label
+            route = scope.get("route")
+            template = getattr(route, "path", None) or "unmatched"
+            REQUEST_COUNT.labels(self.service, method, template, str(status_code)).inc()
+            REQUEST_LATENCY.labels(self.service, method, template).observe(time.perf_counter() - start)
+
+def observe_upstream(service: str, upstream: str, method: str, status: str, duration: float):
+    UPSTREAM_LATENCY.labels(service, upstream, method, status).observe(duration)
+
+def httpx_event_hooks(service: str, upstream: str) -> dict:
+    """Event hooks that time every call an httpx client makes to another service"""
+    async def on_request(request: httpx.Request):
+        request.extensions["metrics_start"] = time.perf_counter()
+
+    async def on_response(response: httpx.Response):
+        start = response.request.extensions.get("metrics_start")
+        if start is not None:
+            observe_upstream(service, upstream, response.request.method, str(response.status_code), time.perf_counter() - start)
+
+    return {"request": [on_request], "response": [on_response]}
+
+def _track_db_pool(service: str, engine):
+    pool = engine.sync_engine.pool
+    # NullPool keeps no connections, so there is nothing to report
+    if not hasattr(pool, "checkedout"):
+        return
+    # Look the pool up on every scrape: engine.dispose() swaps in a new one
+    DB_POOL_CONNECTIONS.labels(service, "size").set_function(lambda: engine.sync_engine.pool.size())
+    DB_POOL_CONNECTIONS.labels(service, "checked_out").set_function(lambda: engine.sync_engine.pool.checkedout())
+    DB_POOL_CONNECTIONS.labels(service, "checked_in").set_function(lambda: engine.sync_engine.pool.checkedin())
+    DB_POOL_CONNECTIONS.labels(service, "overflow").set_function(lambda: engine.sync_engine.pool.overflow())
+    observers = getattr(type(pool), "checkout_wait_observers", None)
+    if observers is not None:
+        observers.append(DB_POOL_CHECKOUT_WAIT.labels(service).observe)
+
+def instrument_app(app: FastAPI, service: str, engine=None):
+    """Install request metrics on a service app and expose them on /metrics"""
+    app.add_middleware(MetricsMiddleware, service=service)
+    if engine is not None:
+        _track_db_pool(service, engine)
+
+    @app.get("/metrics", include_in_schema=False)
+    async def metrics():
+        return Response(content=generate_latest(), media_type=CONTENT_TYPE_LATEST)
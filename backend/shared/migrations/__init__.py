@@ -0,0 +1,118 @@
+import os
+import re
+import pkgutil
+import importlib
+from dataclasses import dataclass
+from typing import List, Optional
+from sqlalchemy import text
+from sqlalchemy.exc import ProgrammingError
+from dotenv import load_dotenv
+from backend.shared.logger import get_logger
+
+load_dotenv()
+logger = get_logger(__name__)
+
+# Apply pending migrations at startup. Turn off in production and run
+# `python -m backend.shared.migrations upgrade` as a deploy step instead.
+DB_AUTO_MIGRATE = os.getenv("DB_AUTO_MIGRATE", "true").lower() == "true"
+
+VERSION_TABLE = "schema_migrations"
+# Arbitrary constant shared by every process, so only one of them migrates at a time
+MIGRATION_LOCK_ID = 72_311_016
+
+@dataclass
+class Migration:
+    version: int
+    description: str
+    statements: List[str]
+    transactional: bool = True  # False for statements Postgres refuses inside a transaction, e.g. CREATE INDEX CONCURRENTLY
+
+def load_migrations() -> List[Migration]:
+    """Migrations are the mNNNN_*.py modules in this package, applied in VERSION order"""
+    migrations = []
+    for module_info in pkgutil.iter_modules(__path__):
+        if not re.match(r"m\d{4}_", module_info.name):
+            continue
+        module = importlib.import_module(f"{__name__}.{module_info.name}")
+        migrations.append(Migration(
+            version=module.VERSION,
+            description=module.DESCRIPTION,
+            statements=module.STATEMENTS,
+            transactional=getattr(module, "TRANSACTIONAL", True),
+        ))
+    migrations.sort(key=lambda migration: migration.version)
+    versions = [migration.version for migration in migrations]
+    if versions != list(range(1, len(versions) + 1)):
+        raise RuntimeError(f"Migration versions must run 1..N without gaps, found {versions}")
+    return migrations
+
+MIGRATIONS = load_migrations()
+LATEST_VERSION = MIGRATIONS[-1].version if MIGRATIONS else 0
+
+_verified = False  # set once this process has seen an up-to-date schema
+
+async def current_version(engine) -> int:
+    async with engine.connect() as conn:
+        try:
+            return (await conn.exec_driver_sql(f"SELECT max(version) FROM {VERSION_TABLE}")).scalar() or 0
+        except ProgrammingError:
+            return 0  # No version table yet: a fresh database
+
+async def upgrade(engine, target: Optional[int] = None) -> int:
+    """Apply pending migrations up to target (default: latest) and return the resulting version"""
+    target = LATEST_VERSION if target is None else target
+    async with engine.connect() as lock_conn:
+        await lock_conn.execution_options(isolation_level="AUTOCOMMIT")
+        # Replicas starting together queue here; whoever gets the lock second finds nothing left to do
+        await lock_conn.exec_driver_sql(f"SELECT pg_advisory_lock({MIGRATION_LOCK_ID})")
+        try:
+            await lock_conn.exec_driver_sql(
+                f"CREATE TABLE IF NOT EXISTS {VERSION_TABLE} ("
+                "version INTEGER PRIMARY KEY, "
+                "description VARCHAR NOT NULL, "
+                "applied_at TIMESTAMP WITH TIME ZONE DEFAULT now())"
+            )
+            version = await current_version(engine)
+            for migration in MIGRATIONS:
+                if migration.version <= version or migration.version > target:
+                    continue
+                logger.info(f"Applying migration {migration.version}: {migration.description}")
+                await _apply(engine, migration)
+                version = migration.version
+            return version
+        finally:
+            await lock_conn.exec_driver_sql(f"SELECT pg_advisory_unlock({MIGRATION_LOCK_ID})")
+
+async def _apply(engine, migration: Migration):
+    record = text(f"INSERT INTO {VERSION_TABLE} (version, description) VALUES (:version, :description)")
+    values = {"version": migration.version, "description": migration.description}
+    if migration.transactional:
+        # DDL is transactional in Postgres: the schema change and its version row land together or not at all
+        async with engine.begin() as conn:
+            for statement in migration.statements:
+                await conn.exec_driver_sql(statement)
+            await conn.execute(record, values)
+        return
+    async with engine.connect() as conn:
+        await conn.execution_options(isolation_level="AUTOCOMMIT")
+        for statement in migration.statements:
+            await conn.exec_driver_sql(statement)
+        await conn.execute(record, values)
+
+async def ensure_schema(engine):
+    """Startup check: one query when the schema is current, instead of create_all reflecting every table"""
+    global _verified
+    if _verified:
+        return
+    version = await current_version(engine)
+    if version < LATEST_VERSION:
+        if not DB_AUTO_MIGRATE:
+            raise RuntimeError(
+                f"Database schema is at version {version} but this build needs {LATEST_VERSION}; "
+                "run `python -m backend.shared.migrations upgrade`"
+            )
+        await upgrade(engine)
+    elif version > LATEST_VERSION:
+        # A newer build already migrated; expected mid rolling deploy, as migrations only add
+        logger.warning(f"Database schema version {version} is ahead of this build ({LATEST_VERSION})")
+    _verified = True
@@ -0,0 +1,21 @@
+import argparse
+import asyncio
+from backend.shared.database import engine
+from backend.shared.migrations import LATEST_VERSION, current_version, upgrade
+
+async def main(command: str, target: int = None):
+    try:
+        if command == "upgrade":
+            version = await upgrade(engine, target)
+            print(f"Schema at version {version}")
+        else:
+            print(f"Schema at version {await current_version(engine)}, latest is {LATEST_VERSION}")
+    finally:
+        await engine.dispose()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Apply or inspect database schema migrations")
+    parser.add_argument("command", choices=["upgrade", "current"])
+    parser.add_argument("--target", type=int, default=None, help="Stop at this version (default: latest)")
+    args = parser.parse_args()
+    asyncio.run(main(args.command, args.target))
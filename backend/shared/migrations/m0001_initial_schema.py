@@ -0,0 +1,88 @@
+VERSION = 1
+DESCRIPTION = "Initial schema"
+
+# Matches what create_all used to build, so databases created that way adopt this version as-is
+STATEMENTS = [
+    """
+    CREATE TABLE IF NOT EXISTS orders (
+        id SERIAL NOT NULL,
+        user_id INTEGER,
+        status VARCHAR,
+        total_amount FLOAT,
+        created_at TIMESTAMP WITH TIME ZONE DEFAULT now(),
+        updated_at TIMESTAMP WITH TIME ZONE,
+        PRIMARY KEY (id)
+    )
+    """,
+    "CREATE INDEX IF NOT EXISTS ix_orders_id ON orders (id)",
+    "CREATE INDEX IF NOT EXISTS ix_orders_user_id ON orders (user_id)",
+    """
+    CREATE TABLE IF NOT EXISTS order_items (
+        id SERIAL NOT NULL,
+        order_id INTEGER,
+        product_id INTEGER,
+        quantity INTEGER,
+        price FLOAT,
+        PRIMARY KEY (id),
+        FOREIGN KEY (order_id) REFERENCES orders (id)
+    )
+    """,
+    "CREATE INDEX IF NOT EXISTS ix_order_items_id ON order_items (id)",
+    """
+    CREATE TABLE IF NOT EXISTS order_state_history (
+        id SERIAL NOT NULL,
+        order_id INTEGER,
+        from_status VARCHAR,
+        to_status VARCHAR,
+        timestamp TIMESTAMP WITH TIME ZONE DEFAULT now(),
+        PRIMARY KEY (id),
+        FOREIGN KEY (order_id) REFERENCES orders (id)
+    )
+    """,
+    "CREATE INDEX IF NOT EXISTS ix_order_state_history_id ON order_state_history (id)",
+    """
+    CREATE TABLE IF NOT EXISTS inventory (
+        id SERIAL NOT NULL,
+        name VARCHAR,
+        sku VARCHAR,
+        stock INTEGER,
+        price FLOAT,
+        category VARCHAR,
+        warehouse_location VARCHAR,
+        reorder_threshold INTEGER,
+        PRIMARY KEY (id)
+    )
+    """,
+    "CREATE UNIQUE INDEX IF NOT EXISTS ix_inventory_sku ON inventory (sku)",
+    "CREATE INDEX IF NOT EXISTS ix_inventory_id ON inventory (id)",
+    "CREATE INDEX IF NOT EXISTS ix_inventory_name ON inventory (name)",
+    """
+    CREATE TABLE IF NOT EXISTS returns (
+        id SERIAL NOT NULL,
+        order_id INTEGER,
+        reason VARCHAR,
+        status VARCHAR,
+        refund_amount FLOAT,
+        PRIMARY KEY (id)
+    )
+    """,
+    "CREATE INDEX IF NOT EXISTS ix_returns_id ON returns (id)",
+    "CREATE INDEX IF NOT EXISTS ix_returns_order_id ON returns (order_id)",
+    """
+    CREATE TABLE IF NOT EXISTS customer_tickets (
+        id SERIAL NOT NULL,
+        user_id INTEGER,
+        agent_id INTEGER,
+        subject VARCHAR,
+        description VARCHAR,
+        status VARCHAR,
+        priority VARCHAR,
+        created_at TIMESTAMP WITH TIME ZONE DEFAULT now(),
+        updated_at TIMESTAMP WITH TIME ZONE,
+        sla_deadline TIMESTAMP WITH TIME ZONE,
+        PRIMARY KEY (id)
+    )
+    """,
+    "CREATE INDEX IF NOT EXISTS ix_customer_tickets_id ON customer_tickets (id)",
+    "CREATE INDEX IF NOT EXISTS ix_customer_tickets_user_id ON customer_tickets (user_id)",
+]
@@ -0,0 +1,11 @@
+VERSION = 2
+DESCRIPTION = "Composite indexes for keyset pagination of order listings"
+
+# CONCURRENTLY keeps orders writable while the indexes build, and cannot run inside a transaction
+TRANSACTIONAL = False
+
+STATEMENTS = [
+    "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_orders_created_at_id ON orders (created_at, id)",
+    "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_orders_user_id_created_at_id ON orders (user_id, created_at, id)",
+    "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_orders_status_created_at_id ON orders (status, created_at, id)",
+]
@@ -0,0 +1,12 @@
+VERSION = 3
+DESCRIPTION = "Index order foreign keys and drop the now redundant ix_orders_user_id"
+
+TRANSACTIONAL = False
+
+STATEMENTS = [
+    # selectinload(Order.items) and the order history both filter on order_id
+    "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_order_items_order_id ON order_items (order_id)",
+    "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_order_state_history_order_id ON order_state_history (order_id)",
+    # Lookups by user_id alone use the leading column of the composite index; this one only slows writes
+    "DROP INDEX CONCURRENTLY IF EXISTS ix_orders_user_id",
+]
@@ -0,0 +1,22 @@
+VERSION = 4
+DESCRIPTION = "Change event log behind the orders, inventory and returns SSE feeds"
+
+STATEMENTS = [
+    """
+    CREATE TABLE IF NOT EXISTS change_events (
+        id BIGSERIAL NOT NULL,
+        entity VARCHAR NOT NULL,
+        entity_id INTEGER NOT NULL,
+        action VARCHAR NOT NULL,
+        user_id INTEGER,
+        status VARCHAR,
+        data JSONB,
+        created_at TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT now(),
+        PRIMARY KEY (id)
+    )
+    """,
+    # Each feed reads forward from a client's Last-Event-ID
+    "CREATE INDEX IF NOT EXISTS ix_change_events_entity_id ON change_events (entity, id)",
+    # Expired events are deleted by age
+    "CREATE INDEX IF NOT EXISTS ix_change_events_created_at ON change_events (created_at)",
+]
@@ -0,0 +1,132 @@
+import os
+import time
+from contextvars import ContextVar
+from typing import Dict, Optional
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from dotenv import load_dotenv
+from backend.shared.logger import get_logger
+from backend.shared.metrics import DB_N_PLUS_ONE, DB_QUERIES_PER_REQUEST, DB_QUERY_LATENCY, DB_QUERY_ROWS, DB_SLOW_QUERIES
+
+load_dotenv()
+logger = get_logger(__name__)
+
+DB_SLOW_QUERY_MS = float(os.getenv("DB_SLOW_QUERY_MS", 200.0))  # statements slower than this are logged with their parameters
+DB_N_PLUS_ONE_THRESHOLD = int(os.getenv("DB_N_PLUS_ONE_THRESHOLD", 5))  # identical statements in one request that count as N+1
+DB_QUERY_DEBUG_HEADER = os.getenv("DB_QUERY_DEBUG_HEADER", "false").lower() == "true"
+
+# e.g. "count=12; time_ms=34.5; rows=40; max_repeated=10"
+QUERY_STATS_HEADER = "x-db-queries"
+
+# Anything else is labelled "OTHER", so the metric labels stay a small fixed set
+OPERATIONS = {"SELECT", "INSERT", "UPDATE", "DELETE", "WITH", "SET"}
+
+class RequestQueries:
+    """Statements one request has run so far"""
+
+    def __init__(self, service: str, scope: Scope):
+        self.service = service
+        self.scope = scope
+        self.count = 0
+        self.seconds = 0.0
+        self.rows = 0
+        self.statements: Dict[str, int] = {}  # statement text -> executions
+
+    @property
+    def route(self) -> str:
+        # Set by the router once the request is matched, which is before any handler queries
+        route = self.scope.get("route")
+        return getattr(route, "path", None) or "unmatched"
+
+    def record(self, statement: str, seconds: float, rows: int):
+        self.count += 1
+        self.seconds += seconds
+        self.rows += rows
+        self.statements[statement] = self.statements.get(statement, 0) + 1
+
+    def repeated(self) -> Dict[str, int]:
+        # Only reads: repeated writes are usually deliberate batches, e.g. one multi-row INSERT per chunk
+        return {
+            statement: times
+            for statement, times in self.statements.items()
+            if times >= DB_N_PLUS_ONE_THRESHOLD and _operation(statement) == "SELECT"
+        }
+
+    def header_value(self) -> str:
+        return (
+            f"count={self.count}; time_ms={self.seconds * 1000:.1f}; rows={self.rows}; "
+            f"max_repeated={max(self.statements.values(), default=0)}"
+        )
+
+_current: ContextVar[Optional[RequestQueries]] = ContextVar("request_queries", default=None)
+
+def _operation(statement: str) -> str:
+    keyword = statement.lstrip().split(None, 1)[0].upper() if statement.strip() else ""
+    return keyword if keyword in OPERATIONS else "OTHER"
+
+def _one_line(statement: str) -> str:
+    return " ".join(statement.split())
+
+# Registered on the Engine class, so the primary and every replica engine are covered
+@event.listens_for(Engine, "before_cursor_execute")
+def _start_query_timer(conn, cursor, statement, parameters, context, executemany):
+    # Kept on the execution context rather than the connection, so a failed statement leaves nothing behind
+    context.query_start = time.perf_counter()
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _record_query(conn, cursor, statement, parameters, context, executemany):
+    elapsed = time.perf_counter() - context.query_start
+    rows = max(cursor.rowcount, 0)  # -1 when the driver can't tell
+    queries = _current.get()
+    # Statements outside any request, e.g. the startup schema check, share one label
+    service = queries.service if queries is not None else "background"
+    route = queries.route if queries is not None else "background"
+    operation = _operation(statement)
+
+    DB_QUERY_LATENCY.labels(service, route, operation).observe(elapsed)
+    DB_QUERY_ROWS.labels(service, route, operation).observe(rows)
+    if queries is not None:
+        queries.record(statement, elapsed, rows)
+
+    if elapsed * 1000 >= DB_SLOW_QUERY_MS:
+        DB_SLOW_QUERIES.labels(service, route).inc()
+        logger.warning(
+            f"Slow query ({elapsed * 1000:.1f} ms, {rows} rows) on {route}: {_one_line(statement)} "
+            f"params={str(parameters)[:1000]}"
+        )
+
+class QueryStatsMiddleware:
+    """Collects every statement a request runs: flags N+1 patterns once it finishes and, when
+    DB_QUERY_DEBUG_HEADER is on, reports the totals in the x-db-queries response header"""
+
+    def __init__(self, app: ASGIApp, service: str):
+        self.app = app
+        self.service = service
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        queries = RequestQueries(self.service, scope)
+
+        async def send_wrapper(message: Message):
+            if message["type"] == "http.response.start" and DB_QUERY_DEBUG_HEADER:
+                MutableHeaders(scope=message).append(QUERY_STATS_HEADER, queries.header_value())
+            await send(message)
+
+        token = _current.set(queries)
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            _current.reset(token)
+            if queries.count:
+                DB_QUERIES_PER_REQUEST.labels(self.service, queries.route).observe(queries.count)
+            for statement, times in queries.repeated().items():
+                DB_N_PLUS_ONE.labels(self.service, queries.route).inc()
+                logger.warning(
+                    f"Possible N+1 on {scope['method']} {queries.route}: same statement ran {times} times: "
+                    f"{_one_line(statement)[:500]}"
+                )
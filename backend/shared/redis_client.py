@@ -0,0 +1,30 @@
+import os
+from typing import Optional
+import redis.asyncio as redis
+from dotenv import load_dotenv
+from .logger import get_logger
+
+load_dotenv()
+logger = get_logger(__name__)
+
+REDIS_HOST = os.getenv("REDIS_HOST", "localhost")
+REDIS_PORT = os.getenv("REDIS_PORT", "6379")
+REDIS_DB = os.getenv("REDIS_DB", "0")
+
+REDIS_URL = os.getenv("REDIS_URL", f"redis://{REDIS_HOST}:{REDIS_PORT}/{REDIS_DB}")
+
+_client: Optional[redis.Redis] = None
+
+def get_redis() -> redis.Redis:
+    """Shared connection-pooled Redis client, created on first use"""
+    global _client
+    if _client is None:
+        _client = redis.from_url(REDIS_URL)
+        logger.info(f"Redis client created for {REDIS_HOST}:{REDIS_PORT}")
+    return _client
+
+async def close_redis():
+    global _client
+    if _client is not None:
+        await _client.aclose()
+        _client = None
@@ -0,0 +1,159 @@
+"""
+Benchmark the order tables' hot queries before and after the indexing migrations.
+
+Seeds a dedicated database (<POSTGRES_DB>_bench) with a large dataset on the original schema,
+times each query and shows its plan, then applies the remaining migrations and measures again.
+Your development database is never touched.
+
+    python benchmark_order_indexes.py --orders 1000000
+"""
+
+import argparse
+import asyncio
+import statistics
+import sys
+import time
+from pathlib import Path
+
+# Add project root to path
+sys.path.append(str(Path(__file__).parent))
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import create_async_engine
+from backend.shared.database import DATABASE_URL, POSTGRES_DB
+from backend.shared import migrations
+
+BENCH_DB = f"{POSTGRES_DB}_bench"
+
+# The access paths the order service actually uses
+QUERIES = {
+    "items of a 50-order page": (
+        "SELECT * FROM order_items WHERE order_id = ANY(:order_ids)",
+        lambda orders: {"order_ids": list(range(orders - 49, orders + 1))},
+    ),
+    "history of one order": (
+        "SELECT * FROM order_state_history WHERE order_id = :order_id ORDER BY timestamp",
+        lambda orders: {"order_id": orders // 2},
+    ),
+    "newest orders": (
+        "SELECT * FROM orders ORDER BY created_at DESC, id DESC LIMIT 50",
+        lambda orders: {},
+    ),
+    "orders of one user": (
+        "SELECT * FROM orders WHERE user_id = :user_id ORDER BY created_at DESC, id DESC LIMIT 50",
+        lambda orders: {"user_id": 42},
+    ),
+    "orders by status": (
+        "SELECT * FROM orders WHERE status = :status ORDER BY created_at DESC, id DESC LIMIT 50",
+        lambda orders: {"status": "SHIPPED"},
+    ),
+}
+
+SEED_STATEMENTS = [
+    # 5,000 users, statuses skewed towards finished orders, spread over the last two years
+    """
+    INSERT INTO orders (user_id, status, total_amount, created_at)
+    SELECT g % 5000,
+           (ARRAY['DELIVERED','DELIVERED','DELIVERED','COMPLETED','SHIPPED','PROCESSING','PENDING','CANCELLED'])[g % 8 + 1],
+           round((random() * 500)::numeric, 2),
+           now() - (random() * interval '730 days')
+    FROM generate_series(1, :orders) g
+    """,
+    """
+    INSERT INTO order_items (order_id, product_id, quantity, price)
+    SELECT o.id, (o.id * 7 + n) % 22 + 1, n, round((random() * 200)::numeric, 2)
+    FROM orders o, generate_series(1, 3) n
+    """,
+    """
+    INSERT INTO order_state_history (order_id, from_status, to_status, timestamp)
+    SELECT id, NULL, 'PENDING', created_at FROM orders
+    UNION ALL
+    SELECT id, 'PENDING', status, created_at + interval '1 day' FROM orders WHERE status <> 'PENDING'
+    """,
+]
+
+def print_header(text):
+    print("\n" + "=" * 70)
+    print(f"  {text}")
+    print("=" * 70)
+
+async def create_bench_database():
+    admin = create_async_engine(DATABASE_URL, isolation_level="AUTOCOMMIT")
+    async with admin.connect() as conn:
+        await conn.exec_driver_sql(f'DROP DATABASE IF EXISTS "{BENCH_DB}"')
+        await conn.exec_driver_sql(f'CREATE DATABASE "{BENCH_DB}"')
+    await admin.dispose()
+
+async def drop_bench_database():
+    admin = create_async_engine(DATABASE_URL, isolation_level="AUTOCOMMIT")
+    async with admin.connect() as conn:
+        await conn.exec_driver_sql(f'DROP DATABASE IF EXISTS "{BENCH_DB}"')
+    await admin.dispose()
+
+async def seed(engine, orders: int):
+    start = time.perf_counter()
+    async with engine.begin() as conn:
+        for statement in SEED_STATEMENTS:
+            await conn.execute(text(statement), {"orders": orders} if ":orders" in statement else {})
+    async with engine.connect() as conn:
+        await conn.execution_options(isolation_level="AUTOCOMMIT")
+        await conn.exec_driver_sql("VACUUM ANALYZE")
+    print(f"Seeded {orders:,} orders with items and history in {time.perf_counter() - start:.1f}s")
+
+async def measure(engine, orders: int, runs: int) -> dict:
+    """Median latency per query, after printing the plan nodes that matter"""
+    results = {}
+    async with engine.connect() as conn:
+        for name, (sql, make_params) in QUERIES.items():
+            params = make_params(orders)
+            plan = (await conn.execute(text(f"EXPLAIN (ANALYZE, BUFFERS) {sql}"), params)).scalars().all()
+            print(f"\n{name}:")
+            for line in plan:
+                if any(node in line for node in ("Scan", "Sort", "Limit", "Execution Time")):
+                    print(f"    {line.strip()}")
+            timings = []
+            for _ in range(runs):
+                start = time.perf_counter()
+                await conn.execute(text(sql), params)
+                timings.append((time.perf_counter() - start) * 1000)
+            results[name] = statistics.median(timings)
+    return results
+
+async def main(orders: int, runs: int, keep: bool):
+    await create_bench_database()
+    engine = create_async_engine(DATABASE_URL.rsplit("/", 1)[0] + f"/{BENCH_DB}")
+    try:
+        print_header(f"Seeding {BENCH_DB} on schema version 1")
+        await migrations.upgrade(engine, target=1)
+        await seed(engine, orders)
+
+        print_header("Before: schema version 1")
+        before = await measure(engine, orders, runs)
+
+        print_header(f"Applying migrations up to version {migrations.LATEST_VERSION}")
+        start = time.perf_counter()
+        await migrations.upgrade(engine)
+        async with engine.connect() as conn:
+            await conn.execution_options(isolation_level="AUTOCOMMIT")
+            await conn.exec_driver_sql("ANALYZE")
+        print(f"Built indexes in {time.perf_counter() - start:.1f}s")
+
+        print_header(f"After: schema version {migrations.LATEST_VERSION}")
+        after = await measure(engine, orders, runs)
+
+        print_header(f"Median latency over {runs} runs (ms)")
+        print(f"{'query':<28}{'before':>12}{'after':>12}{'speedup':>12}")
+        for name in QUERIES:
+            print(f"{name:<28}{before[name]:>12.2f}{after[name]:>12.2f}{before[name] / after[name]:>11.1f}x")
+    finally:
+        await engine.dispose()
+        if not keep:
+            await drop_bench_database()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark order query plans and latency before and after indexing")
+    parser.add_argument("--orders", type=int, default=1_000_000, help="Orders to seed (each gets 3 items and up to 2 history rows)")
+    parser.add_argument("--runs", type=int, default=20, help="Timed executions per query")
+    parser.add_argument("--keep", action="store_true", help=f"Keep the {BENCH_DB} database afterwards")
+    args = parser.parse_args()
+    asyncio.run(main(args.orders, args.runs, args.keep))
@@ -22,27 +22,38 @@ interface Order {
 const OrderList = () => {
     const [orders, setOrders] = useState<Order[]>([])
     const [loading, setLoading] = useState(true)
+    const [loadingMore, setLoadingMore] = useState(false)
     const [error, setError] = useState<string | null>(null)
+    // Keyset cursor for the next page; null once the last page has been loaded
+    const [nextCursor, setNextCursor] = useState<string | null>(null)
 
-    useEffect(() => {
-        const fetchOrders = async () => {
-            try {
-                const response = await fetch('http://localhost:8000/api/orders/')
-                if (!response.ok) {
-                    throw new Error('Failed to fetch orders')
-                }
-                const data = await response.json()
-                setOrders(data)
-            } catch (err) {
-                setError(err instanceof Error ? err.message : 'An error occurred')
-            } finally {
-                setLoading(false)
-            }
+    const fetchOrders = async (cursor: string | null) => {
+        const params = new URLSearchParams({ limit: '50' })
+        if (cursor) {
+            params.set('cursor', cursor)
+        }
+        const response = await fetch(`http://localhost:8000/api/orders/?${params}`)
+        if (!response.ok) {
+            throw new Error('Failed to fetch orders')
         }
+        const data: Order[] = await response.json()
+        setOrders(previous => cursor ? [...previous, ...data] : data)
+        setNextCursor(response.headers.get('X-Next-Cursor'))
+    }
 
-        fetchOrders()
+    useEffect(() => {
+        fetchOrders(null)
+            .catch(err => setError(err instanceof Error ? err.message : 'An error occurred'))
+            .finally(() => setLoading(false))
     }, [])
 
+    const loadMore = () => {
+        setLoadingMore(true)
+        fetchOrders(nextCursor)
+            .catch(err => setError(err instanceof Error ? err.message : 'An error occurred'))
+            .finally(() => setLoadingMore(false))
+    }
+
     const getStatusIcon = (status: string) => {
         switch (status.toUpperCase()) {
             case 'DELIVERED':
@@ -122,6 +133,17 @@ const OrderList = () => {
                     </li>
                 ))}
             </ul>
+            {nextCursor && (
+                <div className="px-4 py-3 text-center border-t border-gray-200">
+                    <button
+                        onClick={loadMore}
+                        disabled={loadingMore}
+                        className="text-sm font-medium text-indigo-600 hover:text-indigo-800 disabled:text-gray-400"
+                    >
+                        {loadingMore ? 'Loading...' : 'Load more'}
+                    </button>
+                </div>
+            )}
         </div>
     )
 }
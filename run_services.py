@@ -2,6 +2,7 @@ import subprocess
 import sys
 import time
 import os
+import argparse
 
 services = [
     {"name": "API Gateway", "port": 8000, "path": "backend.services.gateway_service.main:app"},
@@ -15,11 +16,17 @@ services = [
     {"name": "Analytics Service", "port": 8008, "path": "backend.services.analytics_service.main:app"},
 ]
 
+# All service routers in a single process on the gateway port (no inter-service HTTP hops)
+monolith = [
+    {"name": "Monolith", "port": 8000, "path": "backend.monolith.main:app"},
+]
+
 processes = []
 
-def start_services():
-    print("Starting all microservices...")
-    for service in services:
+def start_services(mode: str = "microservices"):
+    selected = monolith if mode == "monolith" else services
+    print(f"Starting services in {mode} mode...")
+    for service in selected:
         print(f"Starting {service['name']} on port {service['port']}...")
         # Use sys.executable to ensure we use the same python interpreter (virtualenv)
         p = subprocess.Popen(
@@ -40,4 +47,12 @@ def start_services():
         print("Services stopped.")
 
 if __name__ == "__main__":
-    start_services()
+    parser = argparse.ArgumentParser(description="Run the Customer Order Portal backend")
+    parser.add_argument(
+        "--mode",
+        choices=["microservices", "monolith"],
+        default=os.getenv("RUN_MODE", "microservices"),
+        help="microservices: gateway + one process per service; monolith: every router in one process",
+    )
+    args = parser.parse_args()
+    start_services(args.mode)